@@ -0,0 +1,284 @@
+"""A local stand-in for the parts of the GitHub REST API FollowEqualizer uses.
+
+It serves ``/user``, ``/user/followers``, ``/user/following`` and
+``/user/starred`` for one synthetic account, with GitHub-style ``Link``
+pagination, ETags (answering ``If-None-Match`` with 304) and
+``X-RateLimit-*`` headers, and accepts follow/unfollow/unstar mutations.
+Stars are listed newest first and carry ``starred_at`` when requested with
+the ``application/vnd.github.star+json`` media type.
+Every request can be delayed to simulate network latency.
+"""
+
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import json
+import threading
+import time
+
+MAX_PER_PAGE = 100
+STAR_MEDIA_TYPE = "application/vnd.github.star+json"
+# Synthetic stars were made one minute apart, counting back from here
+_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class SyntheticAccount:
+    """Followers, following and stars of a made-up user.
+
+    ``overlap`` is the fraction of followed users who follow back, so a
+    ``connections``-sized account has ``connections * (1 - overlap)``
+    non-followers and as many followers not followed back.
+    """
+
+    def __init__(self, connections, stars=None, overlap=0.5):
+        self.login = "benchmark-user"
+        shared = int(connections * overlap)
+        # Followed users 0..connections-1; followers overlap on the last ``shared``
+        first_follower = connections - shared
+        self.following = [_user(i) for i in range(connections)]
+        self.followers = [
+            _user(i) for i in range(first_follower, first_follower + connections)
+        ]
+        if stars is None:
+            stars = connections // 10
+        # Newest star first, as GitHub lists them
+        self.starred = [_star(i, _EPOCH - timedelta(minutes=i)) for i in range(stars)]
+        self.next_repo = stars
+        # Bumped by every mutation so ETags change with the data
+        self.versions = {"followers": 0, "following": 0, "starred": 0}
+        self.lock = threading.Lock()
+
+    def profile(self):
+        return {
+            "login": self.login,
+            "id": 1,
+            "type": "User",
+            "followers": len(self.followers),
+            "following": len(self.following),
+            "public_repos": 0,
+        }
+
+    def follow(self, login):
+        with self.lock:
+            if not any(user["login"] == login for user in self.following):
+                # Newest first, as GitHub lists them
+                self.following.insert(0, _user(int(login.rsplit("-", 1)[1])))
+                self.versions["following"] += 1
+
+    def unfollow(self, login):
+        with self.lock:
+            self.following = [user for user in self.following if user["login"] != login]
+            self.versions["following"] += 1
+
+    def star(self, count=1):
+        """Star ``count`` new repositories, as if done on github.com."""
+        with self.lock:
+            now = datetime.now(timezone.utc)
+            for _ in range(count):
+                self.starred.insert(0, _star(self.next_repo, now))
+                self.next_repo += 1
+            self.versions["starred"] += 1
+
+    def unstar(self, full_name):
+        with self.lock:
+            self.starred = [
+                star for star in self.starred if star["repo"]["full_name"] != full_name
+            ]
+            self.versions["starred"] += 1
+
+
+class MockGitHub:
+    """Serve a :class:`SyntheticAccount` on localhost from a background thread.
+
+    ``latency`` seconds are slept before every response. ``rate_limit`` is
+    the budget reported in ``X-RateLimit-*`` headers; non-304 responses use
+    it up and requests beyond it get a 403 until the window resets.
+    """
+
+    def __init__(self, account, latency=0.0, rate_limit=1_000_000, reset_after=3600):
+        self.account = account
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.reset_after = reset_after
+        self.requests = 0
+        self._remaining = rate_limit
+        self._reset_at = int(time.time()) + reset_after
+        self._lock = threading.Lock()
+
+        handler = type("Handler", (_Handler,), {"mock": self})
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, name="mock-github", daemon=True
+        )
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def spend(self, charged):
+        """Count a request; returns the rate-limit headers, or None when exhausted."""
+        with self._lock:
+            self.requests += 1
+            now = time.time()
+            if now >= self._reset_at:
+                self._remaining = self.rate_limit
+                self._reset_at = int(now) + self.reset_after
+            if charged:
+                if self._remaining <= 0:
+                    return None
+                self._remaining -= 1
+            return {
+                "X-RateLimit-Limit": str(self.rate_limit),
+                "X-RateLimit-Remaining": str(self._remaining),
+                "X-RateLimit-Reset": str(self._reset_at),
+            }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep connections open between requests, as GitHub does
+    protocol_version = "HTTP/1.1"
+    mock = None  # Set on the subclass MockGitHub creates
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        account = self.mock.account
+        if url.path == "/user":
+            with account.lock:
+                etag = f'W/"user-{account.versions["followers"]}-{account.versions["following"]}"'
+                profile = account.profile()
+            if self.headers.get("If-None-Match") == etag:
+                self._respond(304, None, {"ETag": etag}, charged=False)
+            else:
+                self._respond(200, profile, {"ETag": etag})
+            return
+        collection = url.path.rsplit("/", 1)[-1]
+        if url.path != f"/user/{collection}" or collection not in account.versions:
+            self._respond(404, {"message": "Not Found"})
+            return
+
+        query = parse_qs(url.query)
+        per_page = min(int(query.get("per_page", ["30"])[0]), MAX_PER_PAGE)
+        page = max(int(query.get("page", ["1"])[0]), 1)
+        with account.lock:
+            items = getattr(account, collection)
+            version = account.versions[collection]
+            total = len(items)
+            chunk = items[(page - 1) * per_page : page * per_page]
+
+        stars = self.headers.get("Accept") == STAR_MEDIA_TYPE
+        if collection == "starred" and not stars:
+            chunk = [star["repo"] for star in chunk]
+        etag = f'W/"{collection}-{version}-{per_page}-{page}-{int(stars)}"'
+        if self.headers.get("If-None-Match") == etag:
+            self._respond(304, None, {"ETag": etag}, charged=False)
+            return
+
+        last = max(1, -(-total // per_page))
+        base = f"{self.mock.url}{url.path}?per_page={per_page}&page="
+        links = []
+        if page < last:
+            links.append(f'<{base}{page + 1}>; rel="next"')
+            links.append(f'<{base}{last}>; rel="last"')
+        if page > 1:
+            links.append(f'<{base}1>; rel="first"')
+            links.append(f'<{base}{page - 1}>; rel="prev"')
+        headers = {"ETag": etag}
+        if links:
+            headers["Link"] = ", ".join(links)
+        self._respond(200, chunk, headers)
+
+    def do_PUT(self):
+        self._mutate("PUT")
+
+    def do_DELETE(self):
+        self._mutate("DELETE")
+
+    def _mutate(self, method):
+        path = urlparse(self.path).path
+        account = self.mock.account
+        if path.startswith("/user/following/"):
+            login = path[len("/user/following/") :]
+            if method == "PUT":
+                account.follow(login)
+            else:
+                account.unfollow(login)
+        elif path.startswith("/user/starred/") and method == "DELETE":
+            account.unstar(path[len("/user/starred/") :])
+        else:
+            self._respond(404, {"message": "Not Found"})
+            return
+        self._respond(204, None)
+
+    def _respond(self, status, body, headers=None, charged=True):
+        if self.mock.latency:
+            time.sleep(self.mock.latency)
+        rate_headers = self.mock.spend(charged)
+        if rate_headers is None:
+            status, body, headers = 403, {"message": "API rate limit exceeded"}, None
+            rate_headers = self.mock.spend(False)
+        payload = b"" if body is None else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in {**rate_headers, **(headers or {})}.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def _user(number):
+    login = f"user-{number}"
+    return {
+        "login": login,
+        "id": 1000 + number,
+        "node_id": f"MDQ6VXNlcj{number}",
+        "avatar_url": f"https://avatars.example.com/u/{1000 + number}?v=4",
+        "url": f"https://api.example.com/users/{login}",
+        "html_url": f"https://example.com/{login}",
+        "type": "User",
+        "site_admin": False,
+    }
+
+
+def _star(number, starred_at):
+    return {
+        "starred_at": starred_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "repo": _repo(number),
+    }
+
+
+def _repo(number):
+    owner = _user(number % 5000)
+    name = f"project-{number}"
+    return {
+        "id": 500000 + number,
+        "node_id": f"MDEwOlJlcG9zaXRvcnk{number}",
+        "name": name,
+        "full_name": f"{owner['login']}/{name}",
+        "owner": owner,
+        "private": False,
+        "html_url": f"https://example.com/{owner['login']}/{name}",
+        "description": "A synthetic repository for benchmarks",
+        "fork": number % 7 == 0,
+        "archived": number % 11 == 0,
+        "stargazers_count": number % 1000,
+    }
@@ -0,0 +1,340 @@
+"""Offline benchmarks for FollowEqualizer against a local mock GitHub API.
+
+Measures listing (cold, revalidated and incremental star sync), diffing, Qt list population and bulk
+mutations for synthetic accounts of increasing size, without a token or
+network access::
+
+    python benchmarks/run_benchmarks.py --sizes 1000,10000 --latency 0.02
+    python benchmarks/run_benchmarks.py --json results.json
+    python benchmarks/run_benchmarks.py --baseline results.json --max-regression 0.2
+
+With ``--baseline`` the run fails (exit status 1) when any benchmark got
+slower than the saved results by more than ``--max-regression``.
+"""
+
+from pathlib import Path
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+# The Qt benchmarks never need a display
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from config import Settings  # noqa: E402
+from diff_engine import RelationshipDiff  # noqa: E402
+from github_api import GitHubManager  # noqa: E402
+from mock_github import MockGitHub, SyntheticAccount  # noqa: E402
+
+BENCHMARKS = ("listing", "diff", "render", "mutations")
+COLLECTIONS = ("following", "followers", "starred")
+
+
+class Measurement:
+    """Time a block of work and, optionally, its peak Python allocations."""
+
+    def __init__(self, trace_memory):
+        self.trace_memory = trace_memory
+        self.seconds = None
+        self.peak_mb = None
+
+    def __enter__(self):
+        if self.trace_memory:
+            tracemalloc.start()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.seconds = time.perf_counter() - self._start
+        if self.trace_memory:
+            self.peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+            tracemalloc.stop()
+
+
+def make_manager(server, workdir, backend="sync"):
+    settings = Settings(
+        {
+            "FOLLOWEQUALIZER_API_URL": server.url,
+            "FOLLOWEQUALIZER_CACHE_PATH": os.path.join(
+                workdir, f"cache-{backend}.sqlite3"
+            ),
+            "FOLLOWEQUALIZER_JOURNAL_DIR": os.path.join(workdir, f"journal-{backend}"),
+            "FOLLOWEQUALIZER_BACKEND": backend,
+            # Leave the pacing to the transport so the loop itself is measured
+            "FOLLOWEQUALIZER_MUTATIONS_PER_MINUTE": "600000",
+            "FOLLOWEQUALIZER_MUTATION_BURST": "1000",
+        }
+    )
+    return GitHubManager("benchmark-token", settings)
+
+
+def result(name, size, measurement, items, operation=None, **extra):
+    row = {
+        "benchmark": name,
+        "size": size,
+        "seconds": round(measurement.seconds, 4),
+        "items_per_second": (
+            round(items / measurement.seconds) if measurement.seconds else None
+        ),
+        "peak_mb": measurement.peak_mb and round(measurement.peak_mb, 1),
+        # Peak resident memory of the whole process so far
+        "max_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        ),
+    }
+    if operation is not None:
+        # API traffic of this benchmark alone, from the manager's metrics
+        row["requests"] = operation["requests"]
+        row["not_modified"] = operation["not_modified"]
+        row["bytes"] = operation["bytes"]
+    row.update(extra)
+    return row
+
+
+def fetch_all(manager, name, size, args):
+    """Fetch every collection; returns the result row and the lists."""
+    with Measurement(args.trace_memory) as measurement:
+        with manager.metrics.operation(name):
+            lists = (
+                manager.get_following(),
+                manager.get_followers(),
+                manager.get_starred_repos(),
+            )
+    row = result(
+        name, size, measurement, sum(map(len, lists)), manager.metrics.operations[name]
+    )
+    return row, lists
+
+
+def bench_listing(server, workdir, size, args):
+    manager = make_manager(server, workdir)
+    cold, lists = fetch_all(manager, "listing_cold", size, args)
+
+    # Same lists again: the profile counts and first pages (304s) show nothing
+    # changed, so the stored lists are reused and stars cost one probe
+    manager.expire_cache(COLLECTIONS)
+    revalidate, _ = fetch_all(manager, "listing_revalidate", size, args)
+
+    # Served from the local store without any request
+    manager.clear_internal_cache()
+    stored, _ = fetch_all(manager, "listing_store", size, args)
+
+    # A few repos starred and one unstarred on GitHub since the last sync
+    starred = lists[2]
+    server.account.star(5)
+    if starred:
+        server.account.unstar(starred[len(starred) // 2].full_name)
+    manager.expire_cache(["starred"])
+    with Measurement(args.trace_memory) as measurement:
+        with manager.metrics.operation("listing_star_sync"):
+            synced = manager.get_starred_repos()
+    star_sync = result(
+        "listing_star_sync",
+        size,
+        measurement,
+        len(synced),
+        manager.metrics.operations["listing_star_sync"],
+    )
+    return [cold, revalidate, stored, star_sync], lists
+
+
+def bench_diff(size, following, followers, args):
+    repeats = 5
+    with Measurement(args.trace_memory) as measurement:
+        for _ in range(repeats):
+            diff = RelationshipDiff(following, followers)
+    measurement.seconds /= repeats
+    return [
+        result(
+            "diff",
+            size,
+            measurement,
+            len(following) + len(followers),
+            non_followers=len(diff.non_followers),
+        )
+    ]
+
+
+def bench_render(size, following, args):
+    from PyQt5.QtWidgets import QApplication
+    from list_models import RecordListModel
+    from ui_main import create_list_view
+
+    app = QApplication.instance() or QApplication([])
+    rows = []
+
+    # Pages arriving one at a time, as during a fetch
+    model = RecordListModel(lambda user: user.login)
+    view = create_list_view(model)
+    view.show()
+    app.processEvents()
+    with Measurement(args.trace_memory) as streamed:
+        for start in range(0, len(following), 100):
+            model.append_records(following[start : start + 100])
+            app.processEvents()
+    rows.append(result("render_pages", size, streamed, len(following)))
+
+    # A whole list replaced at once, as on session restore
+    with Measurement(args.trace_memory) as reset:
+        model.set_records(following)
+        app.processEvents()
+    rows.append(result("render_reset", size, reset, len(following)))
+    view.close()
+    view.deleteLater()
+    app.processEvents()
+    return rows
+
+
+def bench_mutations(server, workdir, size, non_followers, args):
+    rows = []
+    users = non_followers[: args.mutations]
+    backends = ["sync"]
+    try:
+        import aiohttp  # noqa: F401
+
+        backends.append("async")
+    except ImportError:
+        print("aiohttp is not installed; skipping the async mutation benchmark")
+
+    for backend in backends:
+        manager = make_manager(server, workdir, backend)
+        name = f"mutations_{backend}"
+        with Measurement(args.trace_memory) as measurement:
+            with manager.metrics.operation(name):
+                count = manager.unfollow_many(users)
+                # Put them back so the next backend unfollows the same users
+                count += manager.follow_many(users)
+        rows.append(
+            result(name, size, measurement, count, manager.metrics.operations[name])
+        )
+        if manager.async_backend is not None:
+            manager.async_backend.close()
+    return rows
+
+
+def run_size(size, args):
+    account = SyntheticAccount(size, overlap=args.overlap)
+    rows = []
+    with MockGitHub(account, latency=args.latency, rate_limit=args.rate_limit) as server:
+        with tempfile.TemporaryDirectory() as workdir:
+            # Every other benchmark works on the lists the listing returned
+            listing_rows, (following, followers, _) = bench_listing(
+                server, workdir, size, args
+            )
+            if "listing" in args.only:
+                rows.extend(listing_rows)
+            if "diff" in args.only:
+                rows.extend(bench_diff(size, following, followers, args))
+            if "render" in args.only:
+                rows.extend(bench_render(size, following, args))
+            if "mutations" in args.only and args.mutations:
+                non_followers = RelationshipDiff(following, followers).non_followers
+                rows.extend(bench_mutations(server, workdir, size, non_followers, args))
+    return rows
+
+
+def print_table(rows):
+    columns = (
+        "benchmark",
+        "size",
+        "seconds",
+        "items_per_second",
+        "requests",
+        "not_modified",
+        "peak_mb",
+        "max_rss_mb",
+    )
+    print("  ".join(f"{column:>18}" for column in columns))
+    for row in rows:
+        cells = ("" if row.get(column) is None else row[column] for column in columns)
+        print("  ".join(f"{cell!s:>18}" for cell in cells))
+
+
+def compare(rows, baseline, max_regression):
+    """Return the benchmarks that are slower than ``baseline`` beyond the allowance."""
+    previous = {(row["benchmark"], row["size"]): row["seconds"] for row in baseline}
+    regressions = []
+    for row in rows:
+        before = previous.get((row["benchmark"], row["size"]))
+        if before and row["seconds"] > before * (1 + max_regression):
+            regressions.append((row["benchmark"], row["size"], before, row["seconds"]))
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        default="1000,10000",
+        help="comma-separated connection counts to simulate (up to 200000)",
+    )
+    parser.add_argument(
+        "--only",
+        default=",".join(BENCHMARKS),
+        help=f"comma-separated subset of: {', '.join(BENCHMARKS)}",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds added to every response"
+    )
+    parser.add_argument(
+        "--overlap",
+        type=float,
+        default=0.5,
+        help="fraction of followed users who follow back",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=int,
+        default=1_000_000,
+        help="primary rate-limit budget the mock server reports",
+    )
+    parser.add_argument(
+        "--mutations",
+        type=int,
+        default=20,
+        help="users unfollowed and followed again per backend (0 to skip)",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="record peak Python allocations (slows every benchmark down)",
+    )
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.2,
+        help="allowed slowdown against the baseline, as a fraction",
+    )
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.only = set(args.only.split(","))
+    rows = []
+    for size in (int(value) for value in args.sizes.split(",")):
+        rows.extend(run_size(size, args))
+    print_table(rows)
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(rows, file, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            regressions = compare(rows, json.load(file), args.max_regression)
+        for name, size, before, after in regressions:
+            print(f"Regression: {name} at {size}: {before:.3f}s -> {after:.3f}s")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+import json
+import os
+import queue
+import threading
+import time
+
+
+class ActionJournal:
+    """Append-only JSONL journal for one kind of bulk action.
+
+    A job starts by writing its plan, the exact records to act on, as the
+    first line. Every completed item is then appended as a checkpoint, so a
+    job interrupted by a crash, a rate limit or the app closing can be
+    resumed from :meth:`pending` without recomputing the diff. A final
+    ``complete`` line closes the job; the next plan replaces the file. Plans
+    record the account they were made for and are ignored under any other.
+
+    Checkpoints are handed to a writer thread, which syncs whatever has
+    queued up with a single fsync, so recording an item never blocks the
+    caller (such as the async backend's event loop) on the disk. A crash can
+    lose the last few checkpoints; those items are simply sent again on
+    resume, which is harmless for follow, unfollow and unstar.
+    """
+
+    def __init__(self, path, account=None):
+        self.path = path
+        # Id of the signed-in account; plans of other accounts are never resumed
+        self.account = account
+        self._lock = threading.Lock()
+        self._file = None
+        self._queue = queue.Queue()
+        self._writer = None
+
+    def pending(self):
+        """Return the payloads of an unfinished job that are not done yet, or None."""
+        entries = []
+        try:
+            with open(self.path, "r") as file:
+                for line in file:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        # A line torn by a crash mid-write; the rest is still valid
+                        continue
+        except FileNotFoundError:
+            return None
+
+        if not entries or entries[0]["type"] != "plan":
+            return None
+        if self.account is None or entries[0].get("account") != self.account:
+            return None
+        done = set()
+        for entry in entries[1:]:
+            if entry["type"] == "complete":
+                return None
+            if entry["type"] in ("done", "skipped"):
+                done.add(entry["key"])
+        plan = entries[0]
+        return [
+            payload for key, payload in zip(plan["keys"], plan["items"]) if key not in done
+        ]
+
+    def start(self, keys, payloads):
+        """Begin a job acting on ``payloads``, identified by ``keys``."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        plan = {
+            "type": "plan",
+            "created_at": time.time(),
+            "account": self.account,
+            "keys": list(keys),
+            "items": list(payloads),
+        }
+        # Write the plan aside and swap it in, so a crash never leaves half a plan
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as file:
+            file.write(json.dumps(plan) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.path)
+        self._file = open(self.path, "a")
+        self._writer = threading.Thread(
+            target=self._write_entries, name="journal-writer", daemon=True
+        )
+        self._writer.start()
+
+    def record_done(self, key):
+        self._append({"type": "done", "key": key})
+
+    def record_failed(self, key, error):
+        # Failed items stay pending and are retried when the job resumes
+        self._append({"type": "failed", "key": key, "error": str(error)})
+
+    def record_skipped(self, key, error):
+        # For errors a retry cannot fix (e.g. a deleted account): leaves the plan
+        self._append({"type": "skipped", "key": key, "error": str(error)})
+
+    def finish(self):
+        """Close the job; ``complete`` is only written if nothing is pending."""
+        self._stop_writer()
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.close()
+            self._file = None
+        if not self.pending():
+            self._append_line({"type": "complete"})
+
+    def discard(self):
+        """Drop an unfinished job's remaining plan, so the next job starts afresh."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def close(self):
+        self._stop_writer()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _append(self, entry):
+        self._queue.put(entry)
+
+    def _write_entries(self):
+        # Runs on the writer thread until _stop_writer queues None
+        while True:
+            entries = [self._queue.get()]
+            while True:
+                try:
+                    entries.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = [json.dumps(entry) + "\n" for entry in entries if entry is not None]
+            if lines:
+                with self._lock:
+                    self._file.write("".join(lines))
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+            if None in entries:
+                return
+
+    def _stop_writer(self):
+        """Write out every queued checkpoint and stop the writer thread."""
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+
+    def _append_line(self, entry):
+        with open(self.path, "a") as file:
+            file.write(json.dumps(entry) + "\n")
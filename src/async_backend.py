@@ -0,0 +1,299 @@
+import asyncio
+import json
+import sys
+import threading
+import time
+
+from github.GithubException import GithubException
+from github.Requester import Requester
+from metrics import Metrics
+from page_fetcher import conditional_headers, count_page, read_page
+from rate_limiter import WaitCancelled
+from transport import IDEMPOTENT_METHODS, RETRY_STATUSES, backoff_delay
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp is only needed when the async backend is selected
+    aiohttp = None
+
+
+class AsyncGitHubBackend:
+    """aiohttp transport for bulk listing and mutations.
+
+    The backend owns one event loop running on a daemon thread and a single
+    ``ClientSession`` on that loop, so every caller shares the same connection
+    pool. Blocking callers (such as the Qt worker threads) submit coroutines
+    with :meth:`run` and wait for the result; inside the loop a semaphore
+    caps how many requests are in flight at once, and every request is paced
+    by the shared rate-limit scheduler.
+
+    Like the sync :class:`~transport.Transport`, connection failures and 5xx
+    answers of idempotent requests are retried up to ``retries`` times with
+    jittered backoff starting at ``backoff`` seconds.
+    """
+
+    def __init__(
+        self,
+        token,
+        store,
+        scheduler,
+        base_url,
+        per_page,
+        concurrency=16,
+        timeout=None,
+        retries=3,
+        backoff=0.5,
+        metrics=None,
+    ):
+        if aiohttp is None:
+            raise RuntimeError("The async backend requires aiohttp (pip install aiohttp)")
+        self.token = token
+        self.store = store
+        self.scheduler = scheduler
+        self.base_url = base_url.rstrip("/")
+        self.per_page = per_page
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.metrics = metrics or Metrics()
+        self._session = None
+        self._semaphore = None
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="github-async", daemon=True
+        )
+        self._thread.start()
+
+    def run(self, coro):
+        """Run ``coro`` on the backend loop and block until it finishes."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def close(self):
+        if self._session is not None:
+            self.run(self._session.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def _get_session(self):
+        # Only ever called on the loop thread, so no locking is needed
+        if self._session is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._session = aiohttp.ClientSession(
+                headers={
+                    "Authorization": f"token {self.token}",
+                    "Accept": "application/vnd.github+json",
+                },
+                connector=aiohttp.TCPConnector(limit=self.concurrency),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def _request(
+        self, method, path, params=None, headers=None, mutation=False, is_cancelled=None
+    ):
+        session = self._get_session()
+        retryable = method in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            with self.metrics.timer("phase_seconds", phase="rate_limit_wait"):
+                await self.scheduler.wait_async(mutation, is_cancelled)
+            async with self._semaphore:
+                start = time.perf_counter()
+                try:
+                    async with session.request(
+                        method, self.base_url + path, params=params, headers=headers
+                    ) as response:
+                        output = await response.read()
+                        response_headers = {
+                            k.lower(): v for k, v in response.headers.items()
+                        }
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    if not retryable or attempt >= self.retries:
+                        raise
+                    reason = type(e).__name__
+                else:
+                    self.metrics.record_request(
+                        "mutation" if mutation else "rest",
+                        response.status,
+                        len(output),
+                        time.perf_counter() - start,
+                    )
+                    self.scheduler.update(response_headers)
+                    if (
+                        response.status not in RETRY_STATUSES
+                        or not retryable
+                        or attempt >= self.retries
+                    ):
+                        return response.status, response_headers, output
+                    reason = str(response.status)
+            self.metrics.incr("http_retries_total", method=method, reason=reason)
+            await asyncio.sleep(backoff_delay(self.backoff, attempt))
+            attempt += 1
+
+    async def _mutate(self, method, path, is_cancelled=None):
+        attempt = 0
+        while True:
+            status, response_headers, output = await self._request(
+                method, path, mutation=True, is_cancelled=is_cancelled
+            )
+            if status < 400:
+                return
+            data = json.loads(output) if output else None
+            if attempt < self.scheduler.max_retries and self.scheduler.is_rate_limited(
+                status, response_headers, data
+            ):
+                self.scheduler.backoff(response_headers, attempt)
+                attempt += 1
+                continue
+            raise Requester.createException(status, response_headers, data)
+
+    ### LISTING ###
+
+    async def fetch_collection(
+        self, collection, path, to_payload, headers=None, on_page=None, is_cancelled=None
+    ):
+        """Async counterpart of ``PageFetcher.fetch``, sharing its page store.
+
+        ``on_page`` is called on the loop thread, in page order.
+        """
+        items, has_next, last_page = await self._fetch_page_with_retry(
+            collection, path, 1, to_payload, headers, is_cancelled
+        )
+        pages = [items]
+        page = 1
+        if on_page:
+            on_page(items, page / last_page)
+        while has_next:
+            batch = range(page + 1, max(last_page, page + 1) + 1)
+            tasks = [
+                asyncio.ensure_future(
+                    self._fetch_page_with_retry(
+                        collection, path, number, to_payload, headers, is_cancelled
+                    )
+                )
+                for number in batch
+            ]
+            try:
+                # Hand pages over in order as soon as each one (and those before it) is in
+                for number, task in zip(batch, tasks):
+                    items, has_next, _ = await task
+                    pages.append(items)
+                    if on_page:
+                        on_page(items, min(number / last_page, 1.0))
+            except BaseException:
+                # A page failed for good (or we were cancelled): stop the rest
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+            page = batch[-1]
+
+        self.store.trim_pages(collection, page)
+        return [item for items in pages for item in items]
+
+    async def _fetch_page_with_retry(
+        self, collection, path, page, to_payload, headers=None, is_cancelled=None
+    ):
+        # Transient failures are retried in _request; here only throttling is
+        attempt = 0
+        while True:
+            try:
+                return await self._fetch_page(
+                    collection, path, page, to_payload, headers, is_cancelled
+                )
+            except GithubException as e:
+                throttled = self.scheduler.is_rate_limited(e.status, e.headers, e.data)
+                if not throttled or attempt >= self.scheduler.max_retries:
+                    raise
+                # The pause is waited out before the next request is sent
+                self.scheduler.backoff(e.headers, attempt)
+                attempt += 1
+
+    async def _fetch_page(
+        self, collection, path, page, to_payload, headers=None, is_cancelled=None
+    ):
+        cached = self.store.load_page(collection, page)
+        status, response_headers, output = await self._request(
+            "GET",
+            path,
+            params={"per_page": self.per_page, "page": page},
+            headers=conditional_headers(cached, headers),
+            is_cancelled=is_cancelled,
+        )
+        with self.metrics.timer("phase_seconds", phase="parse"):
+            result = read_page(
+                self.store,
+                collection,
+                page,
+                cached,
+                status,
+                response_headers,
+                output,
+                to_payload,
+            )
+        count_page(self.metrics, collection, status, cached)
+        return result
+
+    ### MUTATIONS ###
+
+    async def follow(self, login, is_cancelled=None):
+        await self._mutate("PUT", f"/user/following/{login}", is_cancelled)
+
+    async def unfollow(self, login, is_cancelled=None):
+        await self._mutate("DELETE", f"/user/following/{login}", is_cancelled)
+
+    async def unstar(self, full_name, is_cancelled=None):
+        await self._mutate("DELETE", f"/user/starred/{full_name}", is_cancelled)
+
+    async def run_many(
+        self,
+        action,
+        keys,
+        on_progress=None,
+        on_done=None,
+        on_failed=None,
+        is_cancelled=None,
+    ):
+        """Apply ``action`` to every key concurrently; return the keys that succeeded.
+
+        ``on_progress(done, total)`` is called (on the loop thread) as each
+        key completes, ``on_done(key)`` when it succeeds and
+        ``on_failed(key, error)`` when it fails. Keys not yet started when
+        ``is_cancelled()`` turns True are skipped, and ``action(key,
+        is_cancelled)`` stops waiting for the rate limits.
+        """
+        total = len(keys)
+        completed = 0
+        done = []
+        queue = list(reversed(keys))
+
+        # A fixed set of workers pulls keys one at a time, so a cancellation
+        # stops new keys from starting instead of racing thousands of tasks
+        async def worker():
+            nonlocal completed
+            while queue and not (is_cancelled and is_cancelled()):
+                key = queue.pop()
+                try:
+                    await action(key, is_cancelled)
+                except WaitCancelled:
+                    # Not sent; the key stays pending like the ones not started
+                    return
+                except Exception as e:
+                    print(f"Error processing {key}: {e}", file=sys.stderr)
+                    if on_failed:
+                        on_failed(key, e)
+                else:
+                    done.append(key)
+                    if on_done:
+                        on_done(key)
+                completed += 1
+                if on_progress:
+                    on_progress(completed, total)
+
+        await asyncio.gather(*(worker() for _ in range(min(self.concurrency, total))))
+
+        # Report the successes in the order the keys were given
+        succeeded = set(done)
+        return [key for key in keys if key in succeeded]
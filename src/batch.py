@@ -0,0 +1,233 @@
+"""Run a command-line action for many GitHub accounts at once.
+
+Each account runs in its own worker process with its own GitHubManager, so
+it keeps its own token, rate budget, cache and journals, and accounts never
+wait on each other's requests or share the GIL. The results and metrics of
+every account are combined when they finish::
+
+    python src/main.py batch accounts.json fetch non-followers
+    python src/main.py batch --workers 4 accounts.json unfollow --dry-run
+
+The accounts file is a JSON list such as::
+
+    [
+        {"name": "docs-bot", "token_env": "DOCS_BOT_TOKEN"},
+        {"name": "release-bot", "token": "ghp_...",
+         "env": {"FOLLOWEQUALIZER_BACKEND": "async"}}
+    ]
+
+``token_env`` names an environment variable (or .env entry) holding the
+token, so the file itself can stay free of secrets. ``env`` overrides
+settings for that account only.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import json
+import os
+import re
+import sys
+import time
+
+from github.GithubException import GithubException
+
+import cli
+from config import Settings
+from exclusions import ExclusionError
+from github_api import GitHubManager
+from metrics import Metrics
+
+# Account names become folder names under the accounts directory
+_ACCOUNT_NAME = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.-]*")
+
+
+def load_accounts(path, environ):
+    """Read the accounts file; returns a list of (name, token, settings overrides)."""
+    with open(path, "r") as file:
+        entries = json.load(file)
+    if not isinstance(entries, list):
+        raise ValueError("expected a JSON list of accounts")
+
+    accounts = []
+    names = set()
+    for entry in entries:
+        name = entry.get("name", "")
+        if not _ACCOUNT_NAME.fullmatch(name):
+            raise ValueError(f"invalid account name {name!r}")
+        if name in names:
+            raise ValueError(f"account {name!r} is listed twice")
+        names.add(name)
+
+        token = entry.get("token") or environ.get(entry.get("token_env", ""))
+        if not token:
+            raise ValueError(f"no token for account {name!r}")
+        overrides = {key: str(value) for key, value in entry.get("env", {}).items()}
+        accounts.append((name, token, overrides))
+    return accounts
+
+
+def account_environ(name, overrides, settings, environ):
+    """Return the environment the settings of account ``name`` are read from."""
+    folder = os.path.join(settings.accounts_dir, name)
+    account_env = dict(environ)
+    # Followers and stars differ per account, so the cache and journals do too
+    account_env["FOLLOWEQUALIZER_CACHE_PATH"] = os.path.join(
+        folder, "followequalizer_cache.sqlite3"
+    )
+    account_env["FOLLOWEQUALIZER_JOURNAL_DIR"] = os.path.join(folder, "journal")
+    account_env.update(overrides)
+    return account_env
+
+
+class _Prefixed:
+    """Prefix every line written to ``stream``, to tell the accounts apart.
+
+    Lines are written whole, so those of accounts running at the same time
+    do not get mixed up.
+    """
+
+    def __init__(self, stream, prefix):
+        self.stream = stream
+        self.prefix = prefix
+        self._partial = ""
+
+    def write(self, text):
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+        for line in lines:
+            self.stream.write(f"{self.prefix}{line}\n")
+        self.stream.flush()
+        return len(text)
+
+    def flush(self):
+        if self._partial:
+            self.write("\n")
+        self.stream.flush()
+
+
+def run_account(name, token, environ, argv):
+    """Run ``argv`` for one account in a worker process; returns its result.
+
+    The result holds the record payloads, the metrics snapshot and the error
+    message (None on success), all plain data so it can be sent back to the
+    parent process.
+    """
+    args = cli.build_parser().parse_args(argv)
+    # Restored below: the pool may run further accounts in this process
+    stderr = sys.stderr
+    sys.stderr = _Prefixed(stderr, f"[{name}] ")
+    result = {"account": name, "records": [], "metrics": None, "error": None}
+    start = time.perf_counter()
+    github_manager = None
+    try:
+        github_manager = GitHubManager(token, Settings(environ))
+        with github_manager.metrics.operation(args.command):
+            records = cli.run(github_manager, args)
+        result["records"] = [record.to_payload() for record in records]
+    except GithubException as e:
+        print(f"Error talking to GitHub: {e}", file=sys.stderr)
+        result["error"] = str(e)
+    except ExclusionError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        result["error"] = str(e)
+    finally:
+        if github_manager is not None:
+            cli.report(github_manager)
+            result["metrics"] = github_manager.metrics.snapshot()
+        sys.stderr.flush()
+        sys.stderr = stderr
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def write_results(results, args):
+    """Write every account's records: an object keyed by account, or tagged NDJSON lines."""
+    stream = open(args.output, "w") if args.output else sys.stdout
+    try:
+        if args.format == "ndjson":
+            for result in results:
+                for payload in result["records"]:
+                    stream.write(json.dumps({"account": result["account"], **payload}) + "\n")
+        else:
+            combined = {result["account"]: result["records"] for result in results}
+            json.dump(combined, stream, indent=2)
+            stream.write("\n")
+    finally:
+        if args.output:
+            stream.close()
+
+
+def main(batch_args, settings):
+    """Run the batch command; returns the process exit status."""
+    parser = cli.build_parser()
+    if not batch_args.argv or batch_args.argv[0] == "batch":
+        parser.error("batch needs a command to run for each account")
+    # Checked once here so a typo fails before any process starts
+    args = parser.parse_args(batch_args.argv)
+
+    try:
+        accounts = load_accounts(batch_args.accounts, os.environ)
+    except (OSError, ValueError) as e:
+        print(f"Error reading accounts from {batch_args.accounts}: {e}", file=sys.stderr)
+        return 1
+    if not accounts:
+        print("No accounts to run.", file=sys.stderr)
+        return 0
+
+    workers = batch_args.workers or len(accounts)
+    metrics = Metrics()
+    results = {}
+    with metrics.operation("batch"):
+        with ProcessPoolExecutor(max_workers=min(workers, len(accounts))) as pool:
+            futures = {
+                pool.submit(
+                    run_account,
+                    name,
+                    token,
+                    account_environ(name, overrides, settings, os.environ),
+                    batch_args.argv,
+                ): name
+                for name, token, overrides in accounts
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # A crashed worker only fails its own account
+                    print(f"[{name}] Error: {e}", file=sys.stderr)
+                    result = {
+                        "account": name,
+                        "records": [],
+                        "metrics": None,
+                        "error": str(e),
+                        "seconds": None,
+                    }
+                if result["metrics"] is not None:
+                    metrics.merge(result["metrics"], account=name)
+                metrics.incr(
+                    "batch_accounts_total", result="failed" if result["error"] else "ok"
+                )
+                results[name] = result
+
+    # Report in the order of the accounts file, not of completion
+    ordered = [results[name] for name, _, _ in accounts]
+    write_results(ordered, args)
+    failed = [result["account"] for result in ordered if result["error"]]
+    slowest = max((result["seconds"] or 0 for result in ordered), default=0)
+    print(
+        f"Batch: {len(ordered) - len(failed)} of {len(ordered)} accounts succeeded"
+        f" in {metrics.operations['batch']['seconds']:.1f}s"
+        f" (slowest account {slowest:.1f}s).",
+        file=sys.stderr,
+    )
+    if failed:
+        print(f"Failed: {', '.join(failed)}", file=sys.stderr)
+    print(metrics.summary(), file=sys.stderr)
+
+    metrics_path = args.metrics or settings.metrics_path
+    if metrics_path:
+        try:
+            metrics.export(metrics_path)
+        except OSError as e:
+            print(f"Error writing metrics to {metrics_path}: {e}", file=sys.stderr)
+    return 1 if failed else 0
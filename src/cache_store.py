@@ -0,0 +1,246 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Bump when the tables or stored payloads change; the cache is rebuilt from scratch
+SCHEMA_VERSION = 5
+
+
+class CacheStore:
+    """Persistent SQLite store for fetched collections.
+
+    Each collection (``followers``, ``following``, ``starred``) is stored as
+    ordered JSON rows keyed by the item id, together with the time it was
+    last fetched from GitHub. Collections older than ``ttl`` seconds are
+    treated as missing.
+
+    The API pages behind each collection are kept separately with their
+    ETag/Last-Modified validators, so a stale collection can be revalidated
+    page by page instead of downloaded again.
+
+    Small JSON snapshots (such as the window's last session) are kept by name
+    in their own table.
+    """
+
+    def __init__(self, path, ttl):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Worker threads share the connection, guarded by self._lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                for table in ("collections", "items", "pages", "snapshots"):
+                    self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS collections ("
+                " name TEXT PRIMARY KEY,"
+                " fetched_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS items ("
+                " collection TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " position INTEGER NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " PRIMARY KEY (collection, key))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                " collection TEXT NOT NULL,"
+                " page INTEGER NOT NULL,"
+                " etag TEXT,"
+                " last_modified TEXT,"
+                " has_next INTEGER NOT NULL,"
+                " last_page INTEGER NOT NULL,"
+                " items TEXT NOT NULL,"
+                " PRIMARY KEY (collection, page))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                " name TEXT PRIMARY KEY,"
+                " saved_at REAL NOT NULL,"
+                " data TEXT NOT NULL)"
+            )
+
+    def claim(self, account):
+        """Tie the store to ``account`` (a dict with its ``id`` and ``login``).
+
+        Everything stored for another account (or before any account was
+        recorded) is dropped. Returns False if that happened.
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT data FROM snapshots WHERE name = 'account'"
+            ).fetchone()
+            owner = json.loads(row[0]) if row else None
+            if owner is not None and owner.get("id") == account["id"]:
+                return True
+            reset = owner is not None
+            for table in ("collections", "items", "pages", "snapshots"):
+                reset = reset or self._conn.execute(
+                    f"SELECT 1 FROM {table} LIMIT 1"
+                ).fetchone() is not None
+                self._conn.execute(f"DELETE FROM {table}")
+            self._conn.execute(
+                "INSERT INTO snapshots (name, saved_at, data) VALUES ('account', ?, ?)",
+                (time.time(), json.dumps(account)),
+            )
+            return not reset
+
+    def fetched_at(self, name):
+        """Return when a collection was last fetched, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fetched_at FROM collections WHERE name = ?", (name,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def is_fresh(self, name):
+        fetched_at = self.fetched_at(name)
+        return fetched_at is not None and time.time() - fetched_at < self.ttl
+
+    def load(self, name, include_stale=False):
+        """Return the stored payloads of a fresh collection, or None.
+
+        With ``include_stale`` the payloads are returned however old they are.
+        """
+        if not include_stale and not self.is_fresh(name):
+            return None
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload FROM items WHERE collection = ? ORDER BY position",
+                (name,),
+            ).fetchall()
+        return [json.loads(payload) for (payload,) in rows]
+
+    def save(self, name, payloads):
+        """Replace a collection with ``payloads`` and stamp it as just fetched."""
+        rows = [
+            (name, str(payload["id"]), position, json.dumps(payload))
+            for position, payload in enumerate(payloads)
+        ]
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM items WHERE collection = ?", (name,))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO items (collection, key, position, payload)"
+                " VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO collections (name, fetched_at) VALUES (?, ?)",
+                (name, time.time()),
+            )
+
+    def touch(self, name):
+        """Stamp a stored collection as just fetched (e.g. after confirming it is current)."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO collections (name, fetched_at) VALUES (?, ?)",
+                (name, time.time()),
+            )
+
+    def add_item(self, name, payload):
+        """Append a single item to a stored collection (e.g. after a follow)."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO items (collection, key, position, payload)"
+                " VALUES (?, ?, (SELECT COALESCE(MAX(position), -1) + 1"
+                " FROM items WHERE collection = ?), ?)",
+                (name, str(payload["id"]), name, json.dumps(payload)),
+            )
+
+    def remove_item(self, name, key):
+        """Drop a single item from a stored collection (e.g. after an unfollow)."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM items WHERE collection = ? AND key = ?", (name, str(key))
+            )
+
+    def load_page(self, name, page):
+        """Return a stored API page with its validators, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, has_next, last_page, items FROM pages"
+                " WHERE collection = ? AND page = ?",
+                (name, page),
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, has_next, last_page, items = row
+        return {
+            "etag": etag,
+            "last_modified": last_modified,
+            "has_next": bool(has_next),
+            "last_page": last_page,
+            "items": json.loads(items),
+        }
+
+    def save_page(self, name, page, etag, last_modified, has_next, last_page, items):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages"
+                " (collection, page, etag, last_modified, has_next, last_page, items)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    name,
+                    page,
+                    etag,
+                    last_modified,
+                    int(has_next),
+                    last_page,
+                    json.dumps(items),
+                ),
+            )
+
+    def trim_pages(self, name, last_page):
+        """Drop stored pages past the current end of a collection."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM pages WHERE collection = ? AND page > ?", (name, last_page)
+            )
+
+    def load_snapshot(self, name):
+        """Return a saved snapshot, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM snapshots WHERE name = ?", (name,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_snapshot(self, name, data):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO snapshots (name, saved_at, data) VALUES (?, ?, ?)",
+                (name, time.time(), json.dumps(data)),
+            )
+
+    def expire(self, name):
+        """Mark a collection stale, keeping its items until it is refetched."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM collections WHERE name = ?", (name,))
+
+    def invalidate(self, name=None):
+        """Forget one collection, or every collection when ``name`` is None.
+
+        Page validators are kept: the next fetch still goes to GitHub, but
+        unchanged pages come back as cheap 304s.
+        """
+        with self._lock, self._conn:
+            if name is None:
+                self._conn.execute("DELETE FROM items")
+                self._conn.execute("DELETE FROM collections")
+            else:
+                self._conn.execute("DELETE FROM items WHERE collection = ?", (name,))
+                self._conn.execute("DELETE FROM collections WHERE name = ?", (name,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,88 @@
+import threading
+import time
+
+from metrics import Metrics
+
+# Seconds one GET /user answer is reused, so followers and following
+# checked back to back share it
+PROFILE_MAX_AGE = 30
+
+
+class ChangeDetector:
+    """Tell whether a stale followers/following list changed since it was stored.
+
+    A conditional GET /user gives the current follower and following counts
+    (and costs nothing when the profile is unchanged). A list whose count
+    still matches the stored copy then has its first page revalidated: GitHub
+    lists the newest connections first, so a new follower or follow shows up
+    there, and a removal changes the count. If both match, the stored list is
+    reused without paging through the rest.
+
+    Renames and other edits further down cannot be seen this way, so a full
+    listing is still forced once the last one is older than
+    ``full_interval`` seconds.
+    """
+
+    def __init__(self, fetcher, store, full_interval, metrics=None):
+        self.fetcher = fetcher
+        self.store = store
+        self.full_interval = full_interval
+        self.metrics = metrics or Metrics()
+        self._lock = threading.Lock()
+        self._profile = None  # (fetched at, profile)
+
+    def unchanged(self, name, url, to_payload, stored, is_cancelled=None):
+        """Return True if ``stored`` (the payloads of list ``name``) is still current."""
+        listed_at = (self.store.load_snapshot("full_listings") or {}).get(name)
+        if listed_at is None or time.time() - listed_at > self.full_interval:
+            return self._report(name, "due")
+
+        if self.profile(is_cancelled).get(name) != len(stored):
+            return self._report(name, "count")
+
+        # A 304 here is free; a changed page is kept for the full listing
+        items, _, _ = self.fetcher.fetch_page(
+            name, url, 1, to_payload, is_cancelled=is_cancelled
+        )
+        if [item["id"] for item in items] != [p["id"] for p in stored[: len(items)]]:
+            return self._report(name, "first_page")
+        return self._report(name, "unchanged")
+
+    def record_full_listing(self, name):
+        with self._lock:
+            listings = self.store.load_snapshot("full_listings") or {}
+            listings[name] = time.time()
+            self.store.save_snapshot("full_listings", listings)
+
+    def profile(self, is_cancelled=None):
+        """Return the authenticated user's profile, revalidated with its ETag."""
+        with self._lock:
+            if self._profile and time.time() - self._profile[0] < PROFILE_MAX_AGE:
+                return self._profile[1]
+            cached = self.store.load_snapshot("profile")
+            headers = {}
+            if cached and cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            status, response_headers, data = self.fetcher.request(
+                "/user", headers=headers, is_cancelled=is_cancelled
+            )
+            if status == 304 and cached:
+                profile = cached["data"]
+            else:
+                profile = {
+                    key: data.get(key) for key in ("login", "followers", "following")
+                }
+                self.store.save_snapshot(
+                    "profile", {"etag": response_headers.get("etag"), "data": profile}
+                )
+            self._profile = (time.time(), profile)
+            return profile
+
+    def forget_profile(self):
+        """Make the next check ask GitHub for the profile again."""
+        with self._lock:
+            self._profile = None
+
+    def _report(self, name, reason):
+        self.metrics.incr("change_checks_total", collection=name, result=reason)
+        return reason == "unchanged"
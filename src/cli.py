@@ -0,0 +1,242 @@
+"""Headless command line for FollowEqualizer.
+
+Runs the same GitHubManager logic as the GUI without importing Qt, so it can
+be scheduled from cron or CI on machines without a display::
+
+    python src/main.py fetch non-followers --format ndjson
+    python src/main.py unfollow --dry-run --exclude-user octocat
+    python src/main.py batch accounts.json unfollow --dry-run
+"""
+
+import argparse
+import json
+import sys
+
+from github.GithubException import GithubException
+from exclusions import ExclusionError
+from github_api import GitHubManager
+
+FETCH_TARGETS = ("non-followers", "non-followed-followers", "stars")
+
+
+def build_parser():
+    # Options shared by every subcommand
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--format",
+        choices=("json", "ndjson"),
+        default="json",
+        help="write a JSON array (default) or one JSON object per line",
+    )
+    common.add_argument("--output", "-o", help="write results to this file")
+    common.add_argument(
+        "--exclude-file",
+        help='JSON file of exceptions: {"users": [...], "repos": [...]}'
+        " (default: the GUI's exceptions)",
+    )
+    common.add_argument(
+        "--exclude-user",
+        action="append",
+        default=[],
+        help="user to leave alone; wildcards and re:<regex> work too",
+    )
+    common.add_argument(
+        "--exclude-repo",
+        action="append",
+        default=[],
+        help="owner/name to leave alone; also owner/*, wildcards and re:<regex>",
+    )
+    common.add_argument(
+        "--refresh", action="store_true", help="ignore the local cache and refetch"
+    )
+    common.add_argument(
+        "--metrics",
+        help="write API metrics here (.json for JSON, else Prometheus text)",
+    )
+
+    parser = argparse.ArgumentParser(
+        prog="followequalizer",
+        description="Manage GitHub followers and stars without the GUI.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    fetch = commands.add_parser("fetch", parents=[common], help="list a diff")
+    fetch.add_argument("target", choices=FETCH_TARGETS)
+
+    for name, help_text in (
+        ("unfollow", "unfollow users who don't follow you back"),
+        ("follow-back", "follow users who follow you"),
+        ("unstar", "unstar every starred repository not excluded"),
+    ):
+        action = commands.add_parser(name, parents=[common], help=help_text)
+        action.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="print what would change without changing it",
+        )
+        action.add_argument(
+            "--new-plan",
+            action="store_true",
+            help="discard an interrupted run's remaining plan and diff again",
+        )
+
+    batch = commands.add_parser(
+        "batch",
+        help="run one of the commands above for many accounts in parallel",
+        description="Run a command for every account in ACCOUNTS, each in its"
+        " own process with its own token, cache and rate budget. Output,"
+        " --format and --metrics options of the command apply to the"
+        " combined results.",
+    )
+    batch.add_argument(
+        "accounts",
+        help='JSON list of accounts: [{"name": ..., "token_env": ...}, ...]',
+    )
+    batch.add_argument(
+        "--workers",
+        type=int,
+        help="accounts run at once (default: all of them)",
+    )
+    batch.add_argument(
+        "argv",
+        nargs=argparse.REMAINDER,
+        metavar="command ...",
+        help="the command to run for each account, e.g. unfollow --dry-run",
+    )
+    return parser
+
+
+def load_exclusions(github_manager, args):
+    """Return the compiled user and repo exception matchers."""
+    exclusions = github_manager.load_exclude_list(args.exclude_file)
+    # Rules given on the command line apply to this run only
+    exclusions.add(args.exclude_user, "users")
+    exclusions.add(args.exclude_repo, "repos")
+    return exclusions.users, exclusions.repos
+
+
+def select_records(github_manager, target, excluded_users, excluded_repos):
+    """Return the records a fetch target (or the matching action) covers."""
+    if target == "stars":
+        return [
+            repo
+            for repo in github_manager.get_starred_repos()
+            if repo.full_name not in excluded_repos
+        ]
+
+    diff = github_manager.get_relationship_diff(excluded_users)
+    if target == "non-followers":
+        return diff.non_followers
+    return [
+        user
+        for user in diff.non_followed_followers
+        if user.login not in excluded_users
+    ]
+
+
+def write_records(records, output_format, stream):
+    payloads = [record.to_payload() for record in records]
+    if output_format == "ndjson":
+        for payload in payloads:
+            stream.write(json.dumps(payload) + "\n")
+    else:
+        json.dump(payloads, stream, indent=2)
+        stream.write("\n")
+
+
+def report_progress(action):
+    def on_progress(done, total):
+        print(f"{action} {done}/{total}", file=sys.stderr)
+
+    return on_progress
+
+
+def run(github_manager, args):
+    # Before the store or a journal is read: either may hold another account's data
+    github_manager.check_account()
+    if args.refresh:
+        github_manager.invalidate_cache()
+    excluded_users, excluded_repos = load_exclusions(github_manager, args)
+
+    # Each action works on the same records its fetch target lists
+    target = {
+        "fetch": getattr(args, "target", None),
+        "unfollow": "non-followers",
+        "follow-back": "non-followed-followers",
+        "unstar": "stars",
+    }[args.command]
+    journal, method, verb = {
+        "fetch": (None, None, None),
+        "unfollow": ("unfollow", "unfollow_many", "Unfollowing"),
+        "follow-back": ("follow", "follow_many", "Following"),
+        "unstar": ("unstar", "unstar_many", "Unstarring"),
+    }[args.command]
+
+    # An interrupted job is resumed from its journal instead of re-diffing
+    records = None
+    if journal and not args.new_plan:
+        records = github_manager.pending_plan(journal)
+    if records is not None:
+        print(f"Resuming an interrupted {journal}: {len(records)} left.", file=sys.stderr)
+        records = [
+            record
+            for record in records
+            if getattr(record, "full_name", None) not in excluded_repos
+            and getattr(record, "login", "") not in excluded_users
+        ]
+    else:
+        records = select_records(github_manager, target, excluded_users, excluded_repos)
+
+    if args.command != "fetch" and not args.dry_run:
+        bulk_action = getattr(github_manager, method)
+        count = bulk_action(records, on_progress=report_progress(verb))
+        print(f"{verb} done: {count} of {len(records)} succeeded.", file=sys.stderr)
+    elif args.command != "fetch":
+        print(f"Dry run: {len(records)} items would change.", file=sys.stderr)
+
+    return records
+
+
+def write_output(records, args):
+    if args.output:
+        with open(args.output, "w") as file:
+            write_records(records, args.format, file)
+    else:
+        write_records(records, args.format, sys.stdout)
+
+
+def report(github_manager):
+    """Print which lists were reused and the API usage summary to stderr."""
+    for name, reused in sorted(github_manager.change_checks.items()):
+        if reused:
+            print(f"{name}: unchanged on GitHub, reused the local copy.", file=sys.stderr)
+    print(github_manager.metrics.summary(), file=sys.stderr)
+
+
+def main(argv, github_token, settings):
+    """Run the command line; returns the process exit status."""
+    args = build_parser().parse_args(argv)
+    if args.command == "batch":
+        # Imported here: batch imports this module for its worker processes
+        import batch
+
+        return batch.main(args, settings)
+
+    github_manager = None
+    try:
+        github_manager = GitHubManager(github_token, settings)
+        with github_manager.metrics.operation(args.command):
+            records = run(github_manager, args)
+        write_output(records, args)
+    except GithubException as e:
+        print(f"Error talking to GitHub: {e}", file=sys.stderr)
+        return 1
+    except ExclusionError as e:
+        # Raised before anything is changed: no action runs without its exceptions
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if github_manager is not None:
+            report(github_manager)
+            github_manager.export_metrics(args.metrics)
+    return 0
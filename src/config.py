@@ -0,0 +1,90 @@
+from pathlib import Path
+import os
+
+# Root of the project (the directory that holds .env and the local cache)
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+class Settings:
+    """Runtime settings, read from the environment when constructed.
+
+    Build this after ``load_dotenv`` so values from the project's .env file
+    are picked up.
+    """
+
+    def __init__(self, environ=None):
+        env = os.environ if environ is None else environ
+
+        # Local SQLite store for followers, following and starred repos
+        self.cache_path = env.get(
+            "FOLLOWEQUALIZER_CACHE_PATH",
+            str(PROJECT_DIR / "followequalizer_cache.sqlite3"),
+        )
+        # Seconds before a cached collection is considered stale
+        self.cache_ttl = int(env.get("FOLLOWEQUALIZER_CACHE_TTL", 6 * 60 * 60))
+
+        # REST API root; point it at GitHub Enterprise or a local stand-in
+        self.api_url = env.get("FOLLOWEQUALIZER_API_URL", "https://api.github.com")
+
+        # Seconds after which a stale followers/following list is paged through
+        # in full even when GitHub's counts and first page look unchanged
+        self.full_refresh_interval = int(
+            env.get("FOLLOWEQUALIZER_FULL_REFRESH_INTERVAL", 24 * 60 * 60)
+        )
+
+        # Concurrent page requests when enumerating large lists
+        self.fetch_concurrency = int(env.get("FOLLOWEQUALIZER_FETCH_CONCURRENCY", 8))
+        # Attempts per page while throttled; the transport retries other failures
+        self.fetch_retries = int(env.get("FOLLOWEQUALIZER_FETCH_RETRIES", 3))
+
+        # Items per page on every list endpoint; GitHub allows at most 100
+        self.per_page = min(max(int(env.get("FOLLOWEQUALIZER_PER_PAGE", 100)), 1), 100)
+        # Keep-alive connections shared by all worker threads
+        self.http_pool_size = int(env.get("FOLLOWEQUALIZER_HTTP_POOL_SIZE", 16))
+        # Seconds to wait for a connection or a response
+        self.http_timeout = int(env.get("FOLLOWEQUALIZER_HTTP_TIMEOUT", 15))
+        # Retries of idempotent requests after a connection error or a 5xx,
+        # starting ``http_backoff`` seconds apart and doubling, plus jitter
+        self.http_retries = int(env.get("FOLLOWEQUALIZER_HTTP_RETRIES", 3))
+        self.http_backoff = float(env.get("FOLLOWEQUALIZER_HTTP_BACKOFF", 0.5))
+        # PyGithub's own minimum spacing of requests and writes; 0 leaves the
+        # pacing to the shared rate-limit scheduler
+        self.seconds_between_requests = float(
+            env.get("FOLLOWEQUALIZER_SECONDS_BETWEEN_REQUESTS", 0)
+        )
+        self.seconds_between_writes = float(
+            env.get("FOLLOWEQUALIZER_SECONDS_BETWEEN_WRITES", 0)
+        )
+
+        # "sync" (PyGithub) or "async" (aiohttp) transport for bulk work
+        self.backend = env.get("FOLLOWEQUALIZER_BACKEND", "sync")
+        # Requests in flight at once on the async backend
+        self.async_concurrency = int(env.get("FOLLOWEQUALIZER_ASYNC_CONCURRENCY", 16))
+
+        # Pacing for follow/unfollow/unstar, to stay clear of secondary limits
+        self.mutations_per_minute = int(
+            env.get("FOLLOWEQUALIZER_MUTATIONS_PER_MINUTE", 60)
+        )
+        self.mutation_burst = int(env.get("FOLLOWEQUALIZER_MUTATION_BURST", 5))
+
+        # "rest" pages through the REST API; "graphql" pulls 100 slim nodes a page
+        self.fetch_mode = env.get("FOLLOWEQUALIZER_FETCH_MODE", "rest")
+
+        # User and repository exceptions, kept across restarts
+        self.exclude_path = env.get(
+            "FOLLOWEQUALIZER_EXCLUDE_PATH", str(PROJECT_DIR / "exclude_list.json")
+        )
+
+        # Journals of bulk follow/unfollow/unstar jobs, for resuming them
+        self.journal_dir = env.get(
+            "FOLLOWEQUALIZER_JOURNAL_DIR", str(PROJECT_DIR / "journal")
+        )
+
+        # Per-account caches and journals of the batch command, one folder each
+        self.accounts_dir = env.get(
+            "FOLLOWEQUALIZER_ACCOUNTS_DIR", str(PROJECT_DIR / "accounts")
+        )
+
+        # Cumulative API metrics file: ".json" for JSON, else Prometheus text;
+        # empty disables the export
+        self.metrics_path = env.get("FOLLOWEQUALIZER_METRICS_PATH", "")
@@ -0,0 +1,62 @@
+from exclusions import as_matcher
+
+
+class RelationshipDiff:
+    """Diff a following/followers snapshot in a single linear pass.
+
+    Both lists are indexed once by account id (falling back to the lowercased
+    login), so every membership probe is a hash lookup instead of a list scan.
+    """
+
+    def __init__(self, following, followers, exclude_list=None):
+        self.following = following
+        self.followers = followers
+
+        # Logins or compiled exception rules, matched case-insensitively
+        excluded = as_matcher(exclude_list)
+
+        # Build the indexes once per snapshot
+        following_index = {user_key(user): user for user in following}
+        followers_index = {user_key(user): user for user in followers}
+
+        self.non_followers = []
+        self.mutuals = []
+        for key, user in following_index.items():
+            if key in followers_index:
+                self.mutuals.append(user)
+            elif user.login not in excluded:
+                self.non_followers.append(user)
+
+        self.non_followed_followers = [
+            user for key, user in followers_index.items() if key not in following_index
+        ]
+
+
+class IncrementalDiff:
+    """Diff pages of one list against a fully indexed other list.
+
+    Used to stream results: index followers once, then every page of
+    following yields its non-followers straight away (or the other way
+    round for non-followed followers).
+    """
+
+    def __init__(self, indexed_users, exclude_list=None):
+        self.index = {user_key(user) for user in indexed_users}
+        self.excluded = as_matcher(exclude_list)
+
+    def missing(self, users):
+        """Return the users absent from the index (and not excluded)."""
+        return [
+            user
+            for user in users
+            if user_key(user) not in self.index
+            and user.login not in self.excluded
+        ]
+
+
+def user_key(user):
+    """Return the hash key used to match the same account across lists."""
+    user_id = getattr(user, "id", None)
+    if user_id is not None:
+        return user_id
+    return user.login.lower()
@@ -0,0 +1,170 @@
+from fnmatch import translate
+import json
+import os
+import re
+
+# Characters that make a rule a shell-style wildcard pattern
+_WILDCARDS = re.compile(r"[*?\[]")
+
+
+class ExclusionError(ValueError):
+    """An exception rule or exceptions file that cannot be used.
+
+    Raised instead of skipping the bad rule: an exception that silently
+    matches nothing would let bulk actions touch the accounts it protects.
+    """
+
+
+class ExclusionMatcher:
+    """Exception rules compiled for fast membership tests (``name in matcher``).
+
+    A rule is one of:
+
+    - an exact login or ``owner/name`` (kept in a hashed set),
+    - ``owner/*``, matching every repository of that owner (also a set),
+    - a wildcard pattern such as ``bot-*`` or ``*/dotfiles``,
+    - ``re:`` followed by a regular expression that must match the whole name.
+
+    Wildcards and regular expressions are joined into a single compiled
+    pattern, so testing a candidate costs two set lookups and at most one
+    regex match however many exact and owner rules there are. Matching is
+    case-insensitive, like GitHub names. Matchers are never modified after
+    construction and can be shared with worker threads.
+    """
+
+    def __init__(self, rules=()):
+        self.exact = set()
+        self.owners = set()
+        patterns = []
+        for rule in rules:
+            rule = rule.strip()
+            if not rule:
+                continue
+            if rule.startswith("re:"):
+                pattern = rule[3:]
+            elif rule.endswith("/*") and not _WILDCARDS.search(rule[:-2]):
+                self.owners.add(rule[:-2].lower())
+                continue
+            elif _WILDCARDS.search(rule):
+                pattern = translate(rule.lower())
+            else:
+                self.exact.add(rule.lower())
+                continue
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise ExclusionError(f"Invalid exception rule {rule!r}: {e}") from e
+            patterns.append(pattern)
+
+        self.pattern = None
+        if patterns:
+            self.pattern = re.compile(
+                "|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE
+            )
+
+    def __contains__(self, name):
+        name = name.lower()
+        if name in self.exact:
+            return True
+        owner, slash, _ = name.partition("/")
+        if slash and owner in self.owners:
+            return True
+        return self.pattern is not None and self.pattern.fullmatch(name) is not None
+
+    def filter(self, items, key):
+        """Return the items whose ``key(item)`` no rule matches, in order."""
+        return [item for item in items if key(item) not in self]
+
+
+def as_matcher(rules):
+    """Return ``rules`` as an :class:`ExclusionMatcher` (None means no rules)."""
+    if isinstance(rules, ExclusionMatcher):
+        return rules
+    return ExclusionMatcher(rules or ())
+
+
+class ExclusionList:
+    """The user's exceptions, kept across restarts in a JSON file.
+
+    The file keeps user and repository rules apart as
+    ``{"users": [...], "repos": [...]}``. The
+    compiled :attr:`users` and :attr:`repos` matchers are rebuilt after every
+    change, so a matcher handed to a running task never changes under it.
+    """
+
+    def __init__(self, users=(), repos=()):
+        self.user_rules = []
+        self.repo_rules = []
+        self._keys = set()  # Lowercased rules, to skip duplicates
+        self.users = ExclusionMatcher()
+        self.repos = ExclusionMatcher()
+        self.add(users, "users")
+        self.add(repos, "repos")
+
+    @classmethod
+    def load(cls, path):
+        """Read the exceptions saved at ``path``; a missing file means none."""
+        try:
+            with open(path, "r") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return cls()
+        except ValueError as e:
+            raise ExclusionError(f"Cannot read exceptions from {path}: {e}") from e
+        return cls(data.get("users", []), data.get("repos", []))
+
+    def save(self, path):
+        # Write aside and swap in, so a crash never leaves a truncated file
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w") as file:
+            json.dump(self.to_dict(), file, indent=4)
+        os.replace(temp_path, path)
+
+    def to_dict(self):
+        return {"users": list(self.user_rules), "repos": list(self.repo_rules)}
+
+    def rules(self):
+        """Every rule, users first, in the order they were added."""
+        return self.user_rules + self.repo_rules
+
+    def add(self, rules, kind=None):
+        """Add new ``rules``; returns the ones that were not there yet.
+
+        ``kind`` is "users" or "repos"; by default rules containing a ``/``
+        are repository rules and the others user rules. If any rule is
+        invalid, :class:`ExclusionError` is raised and nothing is added.
+        """
+        added = []
+        keys = set(self._keys)
+        user_rules = list(self.user_rules)
+        repo_rules = list(self.repo_rules)
+        for rule in rules:
+            rule = rule.strip()
+            if not rule or rule.lower() in keys:
+                continue
+            keys.add(rule.lower())
+            is_repo = kind == "repos" if kind else "/" in rule
+            (repo_rules if is_repo else user_rules).append(rule)
+            added.append(rule)
+        if added:
+            # Compiled before anything is kept, so a bad rule changes nothing
+            users, repos = ExclusionMatcher(user_rules), ExclusionMatcher(repo_rules)
+            self._keys, self.user_rules, self.repo_rules = keys, user_rules, repo_rules
+            self.users, self.repos = users, repos
+        return added
+
+    def remove(self, rules):
+        """Drop ``rules`` (compared case-insensitively)."""
+        keys = {rule.lower() for rule in rules}
+        self.user_rules = [rule for rule in self.user_rules if rule.lower() not in keys]
+        self.repo_rules = [rule for rule in self.repo_rules if rule.lower() not in keys]
+        self._keys -= keys
+        self._compile()
+
+    def clear(self):
+        self.remove(self.rules())
+
+    def _compile(self):
+        self.users = ExclusionMatcher(self.user_rules)
+        self.repos = ExclusionMatcher(self.repo_rules)
@@ -1,13 +1,193 @@
 from github import Github
-import json
+from github.GithubException import GithubException
+from action_journal import ActionJournal
+from cache_store import CacheStore
+from change_check import ChangeDetector
+from config import Settings
+from exclusions import ExclusionList
+from diff_engine import RelationshipDiff
+from graphql_fetch import GraphQLFetcher
+from metrics import Metrics
+from page_fetcher import PageFetcher
+from rate_limiter import RateLimitScheduler, WaitCancelled
+from records import RepoRecord, UserRecord
+from single_flight import SingleFlightCache
+from star_sync import STAR_HEADERS, StarSync, star_payload
+from transport import Transport
+from requests.exceptions import RequestException
+import os
+import sys
+import threading
+import time
+
+# Mutation failures a retry cannot fix, such as a deleted account or repository
+FINAL_STATUSES = (404, 422)
 
 
 class GitHubManager:
-    def __init__(self, token):
-        self.g = Github(token)
+    def __init__(self, token, settings=None):
+        self.settings = settings or Settings()
+        # Requests, pages, bytes, cache hits and latencies of everything below
+        self.metrics = Metrics()
+        # One keep-alive pool for every thread's requests
+        self.transport = Transport(
+            self.settings.api_url,
+            pool_size=self.settings.http_pool_size,
+            timeout=self.settings.http_timeout,
+            retries=self.settings.http_retries,
+            backoff=self.settings.http_backoff,
+            metrics=self.metrics,
+        )
+        self.g = Github(
+            token,
+            base_url=self.settings.api_url,
+            timeout=self.settings.http_timeout,
+            per_page=self.settings.per_page,
+            retry=self.transport.retry,
+            pool_size=self.settings.http_pool_size,
+            seconds_between_requests=self.settings.seconds_between_requests or None,
+            seconds_between_writes=self.settings.seconds_between_writes or None,
+        )
         self.user = self.g.get_user()  # Could be changed to get_authenticated()
-        self._cached_following = None
-        self._cached_followers = None
+        self.transport.attach(self.user._requester)
+        self.store = CacheStore(self.settings.cache_path, self.settings.cache_ttl)
+        # Shared pacing for every request this manager sends
+        self.scheduler = RateLimitScheduler(
+            mutations_per_minute=self.settings.mutations_per_minute,
+            burst=self.settings.mutation_burst,
+        )
+        self.metrics.gauge("http_per_page", lambda: self.g.per_page)
+        self.metrics.gauge("rate_limit_remaining", lambda: self.scheduler.remaining)
+        self.metrics.gauge("rate_limit_limit", lambda: self.scheduler.limit)
+        self._local = threading.local()
+        self.pages = PageFetcher(
+            self._thread_requester,
+            self.store,
+            self.scheduler,
+            self.g.per_page,
+            concurrency=self.settings.fetch_concurrency,
+            retries=self.settings.fetch_retries,
+            metrics=self.metrics,
+        )
+        # Alternate bulk listing over GraphQL (FOLLOWEQUALIZER_FETCH_MODE=graphql)
+        self.graphql = GraphQLFetcher(
+            self._thread_requester, self.scheduler, self.metrics
+        )
+        # Optional aiohttp transport for listing and bulk mutations
+        self.async_backend = None
+        if self.settings.backend == "async":
+            # Imported here: aiohttp is slow to import and only this mode needs it
+            from async_backend import AsyncGitHubBackend
+
+            self.async_backend = AsyncGitHubBackend(
+                token,
+                self.store,
+                self.scheduler,
+                self.user._requester.base_url,
+                self.g.per_page,
+                concurrency=self.settings.async_concurrency,
+                timeout=self.settings.http_timeout,
+                retries=self.settings.http_retries,
+                backoff=self.settings.http_backoff,
+                metrics=self.metrics,
+            )
+        # Stale starred lists are updated from the newest stars down
+        self.star_sync = StarSync(
+            lambda page, per_page, is_cancelled: self.pages.request_page(
+                "starred", "/user/starred", page, per_page, STAR_HEADERS, is_cancelled
+            ),
+            metrics=self.metrics,
+        )
+        # Stale followers/following lists are reused when GitHub reports no change
+        self.changes = ChangeDetector(
+            self.pages,
+            self.store,
+            self.settings.full_refresh_interval,
+            metrics=self.metrics,
+        )
+        # Collection name -> whether its last refresh reused the stored copy
+        self.change_checks = {}
+        # In-memory collections; concurrent callers share one in-flight fetch
+        self._cache = SingleFlightCache()
+        # Id of the signed-in account, which owns the store and the journals;
+        # None until check_account has heard back from GitHub
+        self.account_id = None
+        self.account_reset = False  # Whether the check dropped another account's data
+        self._account_lock = threading.Lock()
+
+    def check_account(self, is_cancelled=None):
+        """Ask GitHub who is signed in, dropping stored data of any other account.
+
+        This blocks on the network, so it is never done on construction: the
+        window runs it as a background task, the command line before
+        anything else, and listing and bulk actions call it first. Returns
+        the account id, or None if GitHub could not be asked, in which case
+        stored lists are still used but no journaled job is resumed.
+        """
+        with self._account_lock:
+            if self.account_id is None:
+                self.account_id = self._claim_store(is_cancelled)
+            return self.account_id
+
+    def _claim_store(self, is_cancelled=None):
+        try:
+            # Not revalidated with the stored ETag: that may be another account's
+            _, _, profile = self.pages.request("/user", is_cancelled=is_cancelled)
+        except (GithubException, RequestException) as e:
+            # On stderr, so the command line's output stays valid JSON
+            print(f"Error checking the signed-in account: {e}", file=sys.stderr)
+            return None
+        account = {"id": profile["id"], "login": profile["login"]}
+        if not self.store.claim(account):
+            self.account_reset = True
+            print(
+                f"Signed in as {account['login']}; the local cache was reset.",
+                file=sys.stderr,
+            )
+        return account["id"]
+
+    def _thread_requester(self):
+        """Return a PyGithub Requester owned by the calling thread.
+
+        A Requester's connection is not safe to share between threads, so each
+        thread gets its own copy with the same configuration.
+        """
+        requester = getattr(self._local, "requester", None)
+        if requester is None:
+            # PyGithub 2.x has no public accessor for the shared Requester
+            base = self.user._requester
+            requester = self.transport.attach(base.withAuth(base.auth))
+            self._local.requester = requester
+        return requester
+
+    def _mutate(self, verb, url, is_cancelled=None):
+        """Send a mutation through the scheduler, backing off when throttled.
+
+        Raises :class:`~rate_limiter.WaitCancelled`, without sending, if
+        ``is_cancelled()`` turns True while waiting for the rate limits.
+        """
+        attempt = 0
+        while True:
+            with self.metrics.timer("phase_seconds", phase="rate_limit_wait"):
+                self.scheduler.wait(mutation=True, is_cancelled=is_cancelled)
+            start = time.perf_counter()
+            try:
+                headers, _ = self._thread_requester().requestJsonAndCheck(verb, url)
+            except GithubException as e:
+                self.metrics.record_request(
+                    "mutation", e.status, 0, time.perf_counter() - start
+                )
+                self.scheduler.update(e.headers or {})
+                if attempt < self.scheduler.max_retries and self.scheduler.is_rate_limited(
+                    e.status, e.headers, e.data
+                ):
+                    self.scheduler.backoff(e.headers, attempt)
+                    attempt += 1
+                    continue
+                raise
+            self.metrics.record_request("mutation", 204, 0, time.perf_counter() - start)
+            self.scheduler.update(headers)
+            return
 
     def get_repo_by_name(self, repo_name):
         """Fetch a repository by its full name (e.g., 'username/repo_name')"""
@@ -17,52 +197,399 @@ class GitHubManager:
             print(f"Error fetching repository: {e}")
             return None
 
-    def get_following(self):
-        # if self._cached_following is None:
-        self._cached_following = [user for user in self.user.get_following()]
-        return self._cached_following
+    def _load_collection(
+        self,
+        name,
+        url,
+        to_payload,
+        record_class,
+        on_page=None,
+        headers=None,
+        is_cancelled=None,
+    ):
+        """Return a collection as compact records, revalidating the store when stale.
+
+        ``on_page(records, fraction)`` receives each page's records as it
+        arrives; a collection served from the store (or synced incrementally)
+        arrives as one page.
+        """
+        self.check_account(is_cancelled)
+
+        def publish_page(payloads, fraction):
+            on_page([record_class.from_payload(p) for p in payloads], fraction)
+
+        page_callback = publish_page if on_page else None
+
+        payloads = self.store.load(name)
+        if payloads is not None:
+            self.metrics.incr("cache_hits_total", layer="store", collection=name)
+            records = [record_class.from_payload(payload) for payload in payloads]
+            if on_page:
+                on_page(records, 1.0)
+            return records
+
+        with self.metrics.timer("collection_fetch_seconds", collection=name):
+            payloads = self._refresh_stored(name, url, to_payload, is_cancelled)
+            if payloads is not None:
+                records = [record_class.from_payload(p) for p in payloads]
+                if on_page:
+                    on_page(records, 1.0)
+                return records
+
+            self.change_checks[name] = False
+            if self.settings.fetch_mode == "graphql":
+                payloads = self.graphql.fetch(name, on_page=page_callback)
+            elif self.async_backend is not None:
+                payloads = self.async_backend.run(
+                    self.async_backend.fetch_collection(
+                        name,
+                        url,
+                        to_payload,
+                        headers,
+                        on_page=page_callback,
+                        is_cancelled=is_cancelled,
+                    )
+                )
+            else:
+                payloads = self.pages.fetch(
+                    name,
+                    url,
+                    to_payload,
+                    headers,
+                    on_page=page_callback,
+                    is_cancelled=is_cancelled,
+                )
+        self.metrics.incr("items_fetched_total", len(payloads), collection=name)
+        self.store.save(name, payloads)
+        if name != "starred":
+            self.changes.record_full_listing(name)
+        return [record_class.from_payload(payload) for payload in payloads]
+
+    def _refresh_stored(self, name, url, to_payload, is_cancelled=None):
+        """Bring a stale stored collection up to date without a full listing.
+
+        Returns the current payloads, or None when the whole list has to be
+        paged through again.
+        """
+        stored = self.store.load(name, include_stale=True)
+        if not stored:
+            return None
+        if name == "starred":
+            if self.settings.fetch_mode == "graphql":
+                return None
+            payloads = self.star_sync.sync(stored, is_cancelled)
+            if payloads is None:
+                return None
+            self.change_checks[name] = payloads is stored
+            self.store.save(name, payloads)
+            return payloads
+
+        if not self.changes.unchanged(name, url, to_payload, stored, is_cancelled):
+            return None
+        self.change_checks[name] = True
+        self.store.touch(name)
+        return stored
+
+    def unchanged(self, names):
+        """Return True if the last refresh of every one of ``names`` found no change."""
+        return all(self.change_checks.get(name) for name in names)
+
+    def _cached_or_load(
+        self,
+        name,
+        url,
+        to_payload,
+        record_class,
+        on_page,
+        headers=None,
+        is_cancelled=None,
+    ):
+        loaded = False
+
+        def load(publish):
+            nonlocal loaded
+            loaded = True
+            return self._load_collection(
+                name, url, to_payload, record_class, publish, headers, is_cancelled
+            )
 
-    def get_followers(self):
-        if self._cached_followers is None:
-            self._cached_followers = [user for user in self.user.get_followers()]
-        return self._cached_followers
+        records = self._cache.get(name, load, on_page)
+        if not loaded:
+            # Served from memory or from another caller's in-flight fetch
+            self.metrics.incr("cache_hits_total", layer="memory", collection=name)
+        return records
 
-    def get_non_followers(self, exclude_list=None):
-        following = self.get_following()
-        followers = self.get_followers()
+    def get_following(self, on_page=None, is_cancelled=None):
+        return self._cached_or_load(
+            "following",
+            "/user/following",
+            _user_payload,
+            UserRecord,
+            on_page,
+            is_cancelled=is_cancelled,
+        )
 
-        non_followers = [
-            user
-            for user in following
-            if user not in followers and user.login not in exclude_list
-        ]
-        return non_followers
+    def get_followers(self, on_page=None, is_cancelled=None):
+        return self._cached_or_load(
+            "followers",
+            "/user/followers",
+            _user_payload,
+            UserRecord,
+            on_page,
+            is_cancelled=is_cancelled,
+        )
+
+    def get_relationship_diff(self, exclude_list=None, is_cancelled=None):
+        """Diff the current following/followers snapshot in one pass."""
+        following = self.get_following(is_cancelled=is_cancelled)
+        followers = self.get_followers(is_cancelled=is_cancelled)
+        with self.metrics.timer("phase_seconds", phase="diff"):
+            return RelationshipDiff(following, followers, exclude_list)
+
+    def get_non_followers(self, exclude_list=None, is_cancelled=None):
+        return self.get_relationship_diff(exclude_list, is_cancelled).non_followers
 
     def clear_internal_cache(self):
-        self._cached_following = None
-        self._cached_followers = None
+        self._cache.forget()
+
+    def invalidate_cache(self):
+        """Drop both the in-memory and the on-disk cache so the next fetch hits GitHub."""
+        self.clear_internal_cache()
+        self.store.invalidate()
 
-    def get_starred_repos(self):
-        return [repo for repo in self.user.get_starred()]
+    def expire_cache(self, names):
+        """Make the next fetch of ``names`` revalidate with GitHub.
 
-    def unfollow(self, user):
-        # Use the authenticated user object to unfollow
-        self.user.remove_from_following(user)
+        Unlike :meth:`invalidate_cache` the stored items are kept (so a saved
+        session still resolves) until the refetch replaces them.
+        """
+        for name in names:
+            self._cache.forget(name)
+            self.store.expire(name)
+        self.changes.forget_profile()
 
-    def follow(self, user):
-        # Use the authenticated user object to follow the specified user
-        self.user.add_to_following(user)
+    def save_session(self, session):
+        """Persist the window's last state; records are stored by id only."""
+        self.store.save_snapshot("session", session)
 
-    def unstar_repo(self, repo):
-        self.user.remove_from_starred(repo)
+    def load_session(self):
+        """Return the last saved session with its record ids resolved, or None.
 
-    def load_exclude_list(self, path="exclude_list.json"):
+        Records come from the stored collections even when those are stale;
+        ids that are no longer stored (e.g. unfollowed since) are dropped.
+        """
+        session = self.store.load_snapshot("session")
+        if session is None:
+            return None
+        for key, name, record_class in (
+            ("non_followers", "following", UserRecord),
+            ("to_follow", "followers", UserRecord),
+            ("repos", "starred", RepoRecord),
+        ):
+            if session.get(key) is None:
+                continue
+            payloads = self.store.load(name, include_stale=True) or []
+            by_id = {payload["id"]: payload for payload in payloads}
+            session[key] = [
+                record_class.from_payload(by_id[record_id])
+                for record_id in session[key]
+                if record_id in by_id
+            ]
+        return session
+
+    def get_starred_repos(self, on_page=None, is_cancelled=None):
+        # Stars come newest first with their times, for incremental syncs
+        return self._cached_or_load(
+            "starred",
+            "/user/starred",
+            star_payload,
+            RepoRecord,
+            on_page,
+            STAR_HEADERS,
+            is_cancelled,
+        )
+
+    def unfollow(self, user, is_cancelled=None):
+        self._mutate("DELETE", f"/user/following/{user.login}", is_cancelled)
+
+        # Keep the stored snapshot in step; memory reloads from the store
+        self.store.remove_item("following", user.id)
+        self._cache.forget("following")
+
+    def follow(self, user, is_cancelled=None):
+        self._mutate("PUT", f"/user/following/{user.login}", is_cancelled)
+
+        self.store.add_item("following", user.to_payload())
+        self._cache.forget("following")
+
+    def unstar_repo(self, repo, is_cancelled=None):
+        self._mutate("DELETE", f"/user/starred/{repo.full_name}", is_cancelled)
+
+        self.store.remove_item("starred", repo.id)
+        self._cache.forget("starred")
+
+    def _journal(self, name):
+        return ActionJournal(
+            os.path.join(self.settings.journal_dir, f"{name}.jsonl"), self.account_id
+        )
+
+    def pending_plan(self, name):
+        """Return what an interrupted ``unfollow``/``follow``/``unstar`` job has left, or None."""
+        payloads = self._journal(name).pending()
+        if payloads is None:
+            return None
+        record_class = RepoRecord if name == "unstar" else UserRecord
+        return [record_class.from_payload(payload) for payload in payloads]
+
+    def discard_plan(self, name):
+        """Forget what an interrupted ``name`` job has left, so it is not resumed."""
+        self._journal(name).discard()
+
+    def _record_failure(self, journal, key, error):
+        # Items that can never succeed leave the plan; the rest are retried on resume
+        if isinstance(error, GithubException) and error.status in FINAL_STATUSES:
+            journal.record_skipped(key, error)
+        else:
+            journal.record_failed(key, error)
+
+    def _run_many(
+        self, name, items, key, action, async_action, on_progress=None, is_cancelled=None
+    ):
+        """Apply a mutation to every item; returns the items that succeeded.
+
+        The plan and every completed item are journaled under ``name``, so an
+        interrupted job can be picked up with :meth:`pending_plan`. A failed
+        item does not stop the job: it is journaled and retried on resume,
+        unless GitHub's answer is final (see ``FINAL_STATUSES``).
+        ``on_progress(done, total)`` is called after each processed item. Once
+        ``is_cancelled()`` returns True no further items are started, and an
+        item still waiting for the rate limits is not sent; the rest stay
+        pending in the journal.
+        """
+        self.check_account(is_cancelled)
+        journal = self._journal(name)
+        journal.start([key(item) for item in items], [i.to_payload() for i in items])
+        try:
+            total = len(items)
+            if self.async_backend is None:
+                completed = []
+                processed = 0
+                for item in items:
+                    if is_cancelled and is_cancelled():
+                        break
+                    try:
+                        action(item, is_cancelled)
+                    except WaitCancelled:
+                        break
+                    except GithubException as e:
+                        print(f"Error processing {key(item)}: {e}", file=sys.stderr)
+                        self._record_failure(journal, key(item), e)
+                        if self.scheduler.is_rate_limited(e.status, e.headers, e.data):
+                            # Still throttled after backing off; the rest resume next time
+                            break
+                    else:
+                        journal.record_done(key(item))
+                        completed.append(item)
+                    processed += 1
+                    if on_progress:
+                        on_progress(processed, total)
+                return completed
+
+            by_key = {key(item): item for item in items}
+            done = self.async_backend.run(
+                self.async_backend.run_many(
+                    async_action,
+                    list(by_key),
+                    on_progress,
+                    on_done=journal.record_done,
+                    on_failed=lambda k, error: self._record_failure(journal, k, error),
+                    is_cancelled=is_cancelled,
+                )
+            )
+            return [by_key[k] for k in done]
+        finally:
+            journal.finish()
+
+    def unfollow_many(self, users, on_progress=None, is_cancelled=None):
+        """Unfollow ``users``; returns how many were unfollowed."""
+        done = self._run_many(
+            "unfollow",
+            users,
+            lambda user: user.login,
+            self.unfollow,
+            self.async_backend and self.async_backend.unfollow,
+            on_progress,
+            is_cancelled,
+        )
+        if self.async_backend is not None:
+            for user in done:
+                self.store.remove_item("following", user.id)
+            self._cache.forget("following")
+        return len(done)
+
+    def follow_many(self, users, on_progress=None, is_cancelled=None):
+        """Follow ``users``; returns how many were followed."""
+        done = self._run_many(
+            "follow",
+            users,
+            lambda user: user.login,
+            self.follow,
+            self.async_backend and self.async_backend.follow,
+            on_progress,
+            is_cancelled,
+        )
+        if self.async_backend is not None:
+            for user in done:
+                self.store.add_item("following", user.to_payload())
+            self._cache.forget("following")
+        return len(done)
+
+    def unstar_many(self, repos, on_progress=None, is_cancelled=None):
+        """Unstar ``repos``; returns how many were unstarred."""
+        done = self._run_many(
+            "unstar",
+            repos,
+            lambda repo: repo.full_name,
+            self.unstar_repo,
+            self.async_backend and self.async_backend.unstar,
+            on_progress,
+            is_cancelled,
+        )
+        if self.async_backend is not None:
+            for repo in done:
+                self.store.remove_item("starred", repo.id)
+            self._cache.forget("starred")
+        return len(done)
+
+    def export_metrics(self, path=None):
+        """Write the cumulative metrics to ``path`` (default: the configured file).
+
+        ``.json`` files get a JSON snapshot, anything else Prometheus text.
+        Returns False when no file is configured or writing fails.
+        """
+        path = path or self.settings.metrics_path
+        if not path:
+            return False
         try:
-            with open(path, "r") as file:
-                return json.load(file)
-        except FileNotFoundError:
-            return {"users": [], "repos": []}
-
-    def save_exclude_list(self, exclude_list, path="exclude_list.json"):
-        with open(path, "w") as file:
-            json.dump(exclude_list, file, indent=4)
+            self.metrics.export(path)
+        except OSError as e:
+            print(f"Error exporting metrics: {e}", file=sys.stderr)
+            return False
+        return True
+
+    def projected_completion(self, mutations):
+        """Seconds the scheduler expects ``mutations`` more mutations to take."""
+        return self.scheduler.projected_completion(mutations)
+
+    def load_exclude_list(self, path=None):
+        """Return the saved exceptions as an :class:`ExclusionList`."""
+        return ExclusionList.load(path or self.settings.exclude_path)
+
+    def save_exclude_list(self, exclusions, path=None):
+        exclusions.save(path or self.settings.exclude_path)
+
+
+def _user_payload(raw):
+    # Trim the API payload down to the record's fields at fetch time
+    return UserRecord.from_api(raw).to_payload()
+
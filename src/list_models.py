@@ -0,0 +1,116 @@
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt, pyqtSignal
+
+from search_index import SearchIndex
+
+
+class RecordListModel(QAbstractListModel):
+    """List model over fetched records (or plain strings).
+
+    Unlike ``QListWidget``, no per-row item objects are created: the view asks
+    for the text of visible rows only, and rows are appended in whole batches
+    with a single ``beginInsertRows``/``endInsertRows`` pair.
+
+    ``text_of`` maps a record to the text shown for it (e.g. its login).
+    ``search_index`` is kept in step with the rows, and ``generation`` changes
+    whenever they do, so search results computed earlier can be recognised as
+    stale. ``reindexed`` is emitted when a new index replaces the old one, so
+    its substring table can be built on a worker thread.
+    """
+
+    reindexed = pyqtSignal()
+
+    def __init__(self, text_of=str, parent=None):
+        super().__init__(parent)
+        self.text_of = text_of
+        self._records = []
+        self.search_index = SearchIndex()
+        self.generation = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        # Flat list: only the invisible root has children
+        if parent.isValid():
+            return 0
+        return len(self._records)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self.text_of(self._records[index.row()])
+        if role == Qt.UserRole:
+            return self._records[index.row()]
+        return None
+
+    def records(self):
+        return list(self._records)
+
+    def record(self, row):
+        return self._records[row]
+
+    def text(self, row):
+        return self.text_of(self._records[row])
+
+    def append_records(self, records):
+        """Append a batch of records with one insert notification."""
+        if not records:
+            return
+        first = len(self._records)
+        self.beginInsertRows(QModelIndex(), first, first + len(records) - 1)
+        self._records.extend(records)
+        self.search_index.add(self.text_of(record) for record in records)
+        self.generation += 1
+        self.endInsertRows()
+
+    def set_records(self, records):
+        """Replace every row at once."""
+        self.beginResetModel()
+        self._records = list(records)
+        self._reindex()
+        self.endResetModel()
+
+    def sort_records(self, key):
+        """Reorder the rows by ``key(record)``, keeping the records and selection."""
+        order = sorted(range(len(self._records)), key=lambda row: key(self._records[row]))
+        self.layoutAboutToBeChanged.emit()
+        self._records = [self._records[row] for row in order]
+        # Selected (persistent) indexes follow their rows to the new positions
+        new_rows = {row: position for position, row in enumerate(order)}
+        moved = self.persistentIndexList()
+        self.changePersistentIndexList(
+            moved, [self.index(new_rows[index.row()]) for index in moved]
+        )
+        self._reindex(self.search_index.reordered(order))
+        self.layoutChanged.emit()
+
+    def clear(self):
+        self.set_records([])
+
+    def remove_rows(self, rows):
+        """Remove the given row numbers, one notification per contiguous run."""
+        if not rows:
+            return
+        # Work from the bottom up so earlier row numbers stay valid
+        for first, last in reversed(contiguous_ranges(rows)):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._records[first : last + 1]
+            self.endRemoveRows()
+        self._reindex(self.search_index.without(rows))
+
+    def _reindex(self, index=None):
+        # A new index rather than a reset one: a search thread may still hold the old
+        if index is None:
+            index = SearchIndex(self.text_of(record) for record in self._records)
+        self.search_index = index
+        self.generation += 1
+        self.reindexed.emit()
+
+
+def contiguous_ranges(rows):
+    """Collapse row numbers into sorted ``(first, last)`` runs."""
+    ranges = []
+    for row in sorted(set(rows)):
+        if ranges and row == ranges[-1][1] + 1:
+            ranges[-1][1] = row
+        else:
+            ranges.append([row, row])
+    return [(first, last) for first, last in ranges]
@@ -1,24 +1,21 @@
-from PyQt5.QtWidgets import QApplication
-from github_api import GitHubManager
-from ui_main import MainWindow
+from config import Settings
 from dotenv import load_dotenv, find_dotenv
 from pathlib import Path
 import os
+import sys
 
-if __name__ == "__main__":
-
-    # Absolute path to the .env file
-    dotenv_path = Path(__file__).resolve().parent.parent / ".env"
 
-    load_dotenv(dotenv_path)
-
-    github_token = os.getenv("GITHUB_TOKEN")
+def run_gui(github_token, settings):
+    # Qt is only imported for the GUI so the command line starts quickly
+    from PyQt5.QtWidgets import QApplication
+    from github_api import GitHubManager
+    from ui_main import MainWindow
 
     # Create the Qt application
     app = QApplication([])
 
     # Create your GitHub manager instance with the token
-    github_manager = GitHubManager(github_token)
+    github_manager = GitHubManager(github_token, settings)
 
     # Create the main window
     window = MainWindow(github_manager)
@@ -26,3 +23,24 @@ if __name__ == "__main__":
 
     # Execute the application
     app.exec_()
+
+
+if __name__ == "__main__":
+
+    # Absolute path to the .env file
+    dotenv_path = Path(__file__).resolve().parent.parent / ".env"
+
+    load_dotenv(dotenv_path)
+
+    github_token = os.getenv("GITHUB_TOKEN")
+
+    # Read the remaining settings now that the .env values are loaded
+    settings = Settings()
+
+    # Any arguments select the headless command line instead of the GUI
+    if len(sys.argv) > 1:
+        import cli
+
+        sys.exit(cli.main(sys.argv[1:], github_token, settings))
+
+    run_gui(github_token, settings)
@@ -0,0 +1,213 @@
+from contextlib import contextmanager
+import json
+import os
+import threading
+import time
+
+
+class Metrics:
+    """Thread-safe counters, timings and gauges for API calls and hot paths.
+
+    Counters and timings are keyed by a name plus labels (e.g. the request
+    kind or the collection), in the style of Prometheus. Gauges are read
+    from callbacks when a snapshot is taken, so values such as the remaining
+    rate-limit budget are always current.
+
+    :meth:`operation` measures one user-level operation (such as "Find
+    Non-Followers") as the change in the totals while it ran; operations
+    that overlap in time share each other's traffic.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self._counters = {}  # (name, labels) -> value
+        self._timings = {}  # (name, labels) -> [count, total seconds, max seconds]
+        self._gauges = {}  # name -> callback returning a number or None
+        self.operations = {}  # Operation name -> summary of its last run
+
+    def incr(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            timing = self._timings.setdefault(key, [0, 0.0, 0.0])
+            timing[0] += 1
+            timing[1] += seconds
+            timing[2] = max(timing[2], seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def gauge(self, name, callback):
+        """Report ``callback()`` as gauge ``name`` in every snapshot."""
+        with self._lock:
+            self._gauges[name] = callback
+
+    def record_request(self, kind, status, size, seconds):
+        """Count one HTTP request: its kind (rest/graphql/mutation), status and bytes."""
+        self.incr("api_requests_total", kind=kind, status=str(status))
+        self.incr("api_response_bytes_total", size, kind=kind)
+        self.observe("api_request_seconds", seconds, kind=kind)
+
+    def total(self, name):
+        """Sum a counter over all of its labels."""
+        with self._lock:
+            return sum(v for (n, _), v in self._counters.items() if n == name)
+
+    def _totals(self):
+        return {
+            "requests": self.total("api_requests_total"),
+            "not_modified": self._count_where("api_requests_total", status="304"),
+            "pages": self.total("pages_total"),
+            "bytes": self.total("api_response_bytes_total"),
+            "cache_hits": self.total("cache_hits_total"),
+        }
+
+    def _count_where(self, name, **labels):
+        wanted = set(labels.items())
+        with self._lock:
+            return sum(
+                v
+                for (n, key_labels), v in self._counters.items()
+                if n == name and wanted <= set(key_labels)
+            )
+
+    @contextmanager
+    def operation(self, name):
+        """Record the requests, pages, bytes, cache hits and time of one operation."""
+        before = self._totals()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            after = self._totals()
+            summary = {key: after[key] - before[key] for key in after}
+            summary["seconds"] = round(seconds, 3)
+            self.observe("operation_seconds", seconds, operation=name)
+            with self._lock:
+                self.operations[name] = summary
+
+    def gauges(self):
+        with self._lock:
+            callbacks = dict(self._gauges)
+        values = {}
+        for name, callback in callbacks.items():
+            value = callback()
+            if value is not None:
+                values[name] = value
+        return values
+
+    def snapshot(self):
+        """Return every metric as a JSON-friendly dict."""
+        gauges = self.gauges()
+        with self._lock:
+            return {
+                "uptime_seconds": round(time.time() - self.started_at, 3),
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(self._counters.items())
+                ],
+                "timings": [
+                    {
+                        "name": name,
+                        "labels": dict(labels),
+                        "count": count,
+                        "total_seconds": round(total, 6),
+                        "max_seconds": round(longest, 6),
+                    }
+                    for (name, labels), (count, total, longest) in sorted(
+                        self._timings.items()
+                    )
+                ],
+                "gauges": gauges,
+                "operations": dict(self.operations),
+            }
+
+    def merge(self, snapshot, **labels):
+        """Add the counters and timings of another process's :meth:`snapshot`.
+
+        ``labels`` (e.g. the account) are added to every merged metric, and
+        its operations are kept as "label: operation".
+        """
+        extra = tuple(labels.items())
+        prefix = ", ".join(str(value) for value in labels.values())
+        with self._lock:
+            for counter in snapshot["counters"]:
+                key = (
+                    counter["name"],
+                    tuple(sorted(tuple(counter["labels"].items()) + extra)),
+                )
+                self._counters[key] = self._counters.get(key, 0) + counter["value"]
+            for timing in snapshot["timings"]:
+                key = (
+                    timing["name"],
+                    tuple(sorted(tuple(timing["labels"].items()) + extra)),
+                )
+                merged = self._timings.setdefault(key, [0, 0.0, 0.0])
+                merged[0] += timing["count"]
+                merged[1] += timing["total_seconds"]
+                merged[2] = max(merged[2], timing["max_seconds"])
+            for name, summary in snapshot["operations"].items():
+                self.operations[f"{prefix}: {name}" if prefix else name] = summary
+
+    def summary(self):
+        """One status line of cumulative API use and the remaining rate budget."""
+        totals = self._totals()
+        line = (
+            f"API: {totals['requests']:g} requests"
+            f" ({totals['not_modified']:g} not modified),"
+            f" {totals['pages']:g} pages, {totals['bytes'] / 1e6:.1f} MB,"
+            f" {totals['cache_hits']:g} cache hits"
+        )
+        gauges = self.gauges()
+        if "rate_limit_remaining" in gauges and "rate_limit_limit" in gauges:
+            line += (
+                f"; rate budget {gauges['rate_limit_remaining']}"
+                f"/{gauges['rate_limit_limit']}"
+            )
+        return line
+
+    def to_prometheus(self):
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        snapshot = self.snapshot()
+        for counter in snapshot["counters"]:
+            name = f"followequalizer_{counter['name']}"
+            lines.append(f"{name}{_labels(counter['labels'])} {counter['value']}")
+        for timing in snapshot["timings"]:
+            name = f"followequalizer_{timing['name']}"
+            labels = _labels(timing["labels"])
+            lines.append(f"{name}_count{labels} {timing['count']}")
+            lines.append(f"{name}_sum{labels} {timing['total_seconds']}")
+        for name, value in snapshot["gauges"].items():
+            lines.append(f"followequalizer_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        """Write the metrics to ``path``: JSON for ``.json`` files, else Prometheus text."""
+        if path.endswith(".json"):
+            content = json.dumps(self.snapshot(), indent=2)
+        else:
+            content = self.to_prometheus()
+        # Replace the file in one step so scrapers never read half of it
+        temp_path = path + ".tmp"
+        with open(temp_path, "w") as file:
+            file.write(content)
+        os.replace(temp_path, path)
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    inner = ",".join(f'{key}="{value}"' for key, value in sorted(labels.items()))
+    return "{" + inner + "}"
@@ -0,0 +1,253 @@
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlparse
+import json
+import re
+import time
+
+from github.GithubException import GithubException
+from github.Requester import Requester
+from metrics import Metrics
+
+# Matches one entry of a Link header, e.g. <https://...&page=2>; rel="next"
+_LINK_RE = re.compile(r'<([^>]+)>;\s*rel="([^"]+)"')
+
+
+class PageFetcher:
+    """Walk a paginated REST list, revalidating each page with its ETag.
+
+    Every page's ETag and Last-Modified value is kept in the cache store
+    next to the (already trimmed) items it contained. On the next walk each
+    page is requested conditionally: a 304 reuses the stored items without
+    parsing a response body, and GitHub does not charge 304s against the
+    rate limit. Only pages that changed are parsed and stored again.
+
+    The first page tells us the last page number (from its ``rel="last"``
+    link), after which the remaining pages are pulled concurrently by a
+    bounded worker pool and reassembled in page order. A throttled page waits
+    for the rate-limit scheduler and is tried again on its own; network and
+    server errors are retried by the transport underneath.
+
+    ``requester_factory`` must return a Requester owned by the calling thread.
+    """
+
+    def __init__(
+        self,
+        requester_factory,
+        store,
+        scheduler,
+        per_page,
+        concurrency=8,
+        retries=3,
+        metrics=None,
+    ):
+        self.requester_factory = requester_factory
+        self.store = store
+        self.scheduler = scheduler
+        self.per_page = per_page
+        self.retries = retries
+        self.metrics = metrics or Metrics()
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="page-fetch"
+        )
+
+    def fetch(
+        self, collection, url, to_payload, headers=None, on_page=None, is_cancelled=None
+    ):
+        """Return the trimmed payloads of every page of ``url``, in order.
+
+        ``on_page(items, fraction)`` is called on the calling thread as each
+        page arrives, in page order, with the fraction of pages done so far.
+        Once ``is_cancelled()`` is True, waits for the rate limits raise
+        :class:`~rate_limiter.WaitCancelled`.
+        """
+        items, has_next, last_page = self._fetch_page_with_retry(
+            collection, url, 1, to_payload, headers, is_cancelled
+        )
+        pages = [items]
+        page = 1
+        if on_page:
+            on_page(items, page / last_page)
+        while has_next:
+            # Fetch every page we know about at once; if the list grew while we
+            # were paging, the final page still links onwards and we go again
+            batch = range(page + 1, max(last_page, page + 1) + 1)
+            results = self._executor.map(
+                lambda number: self._fetch_page_with_retry(
+                    collection, url, number, to_payload, headers, is_cancelled
+                ),
+                batch,
+            )
+            for number, (items, has_next, _) in zip(batch, results):
+                pages.append(items)
+                if on_page:
+                    on_page(items, min(number / last_page, 1.0))
+            page = batch[-1]
+
+        # The list may have shrunk since the last walk
+        self.store.trim_pages(collection, page)
+        return [item for items in pages for item in items]
+
+    def request(self, url, parameters=None, headers=None, is_cancelled=None):
+        """Send one GET outside the page store; returns ``(status, headers, data)``.
+
+        A 304 comes back with no data; other error statuses raise.
+        """
+        return self._with_retry(
+            lambda: self._request(url, parameters, headers, is_cancelled)
+        )
+
+    def request_page(
+        self, collection, url, page, per_page, headers=None, is_cancelled=None
+    ):
+        """Fetch one page outside the page store; returns ``(data, last_page)``.
+
+        For callers that compare pages or stop early instead of walking the
+        whole list.
+        """
+        _, response_headers, data = self.request(
+            url, {"per_page": per_page, "page": page}, headers, is_cancelled
+        )
+        self.metrics.incr("pages_total", collection=collection)
+        links = parse_link_header(response_headers.get("link"))
+        return data, _page_number(links.get("last"), default=page)
+
+    def fetch_page(
+        self, collection, url, page, to_payload, headers=None, is_cancelled=None
+    ):
+        """Fetch one page through the page store; returns ``(items, has_next, last_page)``."""
+        return self._fetch_page_with_retry(
+            collection, url, page, to_payload, headers, is_cancelled
+        )
+
+    def _fetch_page_with_retry(
+        self, collection, url, page, to_payload, headers=None, is_cancelled=None
+    ):
+        return self._with_retry(
+            lambda: self._fetch_page(
+                collection, url, page, to_payload, headers, is_cancelled
+            )
+        )
+
+    def _with_retry(self, fetch):
+        # Connection errors and 5xx answers are already retried by the
+        # transport; only throttled requests are tried again here
+        attempt = 1
+        while True:
+            try:
+                return fetch()
+            except GithubException as e:
+                throttled = self.scheduler.is_rate_limited(e.status, e.headers, e.data)
+                if not throttled or attempt >= self.retries:
+                    raise
+                self.scheduler.backoff(e.headers, attempt - 1)
+                attempt += 1
+
+    def _fetch_page(
+        self, collection, url, page, to_payload, headers=None, is_cancelled=None
+    ):
+        cached = self.store.load_page(collection, page)
+
+        with self.metrics.timer("phase_seconds", phase="rate_limit_wait"):
+            self.scheduler.wait(is_cancelled=is_cancelled)
+        start = time.perf_counter()
+        status, response_headers, output = self.requester_factory().requestJson(
+            "GET",
+            url,
+            parameters={"per_page": self.per_page, "page": page},
+            headers=conditional_headers(cached, headers),
+        )
+        self.metrics.record_request(
+            "rest", status, len(output or ""), time.perf_counter() - start
+        )
+        self.scheduler.update(response_headers)
+        with self.metrics.timer("phase_seconds", phase="parse"):
+            result = read_page(
+                self.store,
+                collection,
+                page,
+                cached,
+                status,
+                response_headers,
+                output,
+                to_payload,
+            )
+        count_page(self.metrics, collection, status, cached)
+        return result
+
+    def _request(self, url, parameters=None, headers=None, is_cancelled=None):
+        with self.metrics.timer("phase_seconds", phase="rate_limit_wait"):
+            self.scheduler.wait(is_cancelled=is_cancelled)
+        start = time.perf_counter()
+        status, response_headers, output = self.requester_factory().requestJson(
+            "GET", url, parameters=parameters, headers=dict(headers or {})
+        )
+        self.metrics.record_request(
+            "rest", status, len(output or ""), time.perf_counter() - start
+        )
+        self.scheduler.update(response_headers)
+        data = json.loads(output) if output else None
+        if status >= 400:
+            raise Requester.createException(status, response_headers, data)
+        return status, response_headers, data
+
+
+def conditional_headers(cached, headers=None):
+    """Return request headers that revalidate a stored page."""
+    request_headers = dict(headers or {})
+    if cached is not None:
+        if cached["etag"]:
+            request_headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            request_headers["If-Modified-Since"] = cached["last_modified"]
+    return request_headers
+
+
+def read_page(store, collection, page, cached, status, response_headers, output, to_payload):
+    """Turn a (possibly 304) page response into ``(items, has_next, last_page)``.
+
+    Changed pages are trimmed with ``to_payload`` and written back to the
+    store together with their new validators.
+    """
+    # Not modified: reuse the stored copy of this page
+    if status == 304 and cached is not None:
+        return cached["items"], cached["has_next"], cached["last_page"]
+
+    data = json.loads(output) if output else None
+    if status >= 400:
+        raise Requester.createException(status, response_headers, data)
+
+    items = [to_payload(raw) for raw in data]
+    links = parse_link_header(response_headers.get("link"))
+    has_next = "next" in links
+    last_page = _page_number(links.get("last"), default=page)
+    store.save_page(
+        collection,
+        page,
+        response_headers.get("etag"),
+        response_headers.get("last-modified"),
+        has_next,
+        last_page,
+        items,
+    )
+    return items, has_next, last_page
+
+
+def count_page(metrics, collection, status, cached):
+    """Count a page read by ``read_page``; a 304 served from the store is a cache hit."""
+    metrics.incr("pages_total", collection=collection)
+    if status == 304 and cached is not None:
+        metrics.incr("cache_hits_total", layer="etag", collection=collection)
+
+
+def parse_link_header(value):
+    """Return a ``{rel: url}`` mapping for a Link response header."""
+    if not value:
+        return {}
+    return {rel: url for url, rel in _LINK_RE.findall(value)}
+
+
+def _page_number(url, default):
+    if not url:
+        return default
+    values = parse_qs(urlparse(url).query).get("page")
+    return int(values[0]) if values else default
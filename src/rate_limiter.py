@@ -0,0 +1,169 @@
+import asyncio
+import threading
+import time
+
+# Longest single sleep of a cancellable wait, so cancelling is noticed quickly
+WAIT_SLICE = 0.25
+
+
+class WaitCancelled(Exception):
+    """Raised by :meth:`RateLimitScheduler.wait` when its caller was cancelled."""
+
+
+class RateLimitScheduler:
+    """Paces requests against GitHub's primary and secondary rate limits.
+
+    The primary budget (``X-RateLimit-Remaining`` / ``X-RateLimit-Reset``) is
+    tracked from every response the app sees. Mutations are additionally
+    paced by a token bucket, since GitHub's secondary limits punish bursts of
+    content-changing requests. When a response says we were throttled
+    (403/429), every caller pauses until ``Retry-After``, the primary reset,
+    or an exponential backoff has passed, and the mutation rate is eased off.
+
+    One scheduler is shared by every thread and by the async backend.
+    """
+
+    def __init__(self, mutations_per_minute=60, burst=5, max_retries=5):
+        self.mutation_interval = 60.0 / mutations_per_minute
+        self.burst = burst
+        self.max_retries = max_retries
+
+        self.remaining = None
+        self.limit = None
+        self.reset_at = None  # epoch seconds
+
+        self._lock = threading.Lock()
+        self._paused_until = 0.0  # epoch seconds
+        self._next_mutation = 0.0  # token bucket's theoretical arrival time
+
+    def update(self, headers):
+        """Record the primary budget reported by a response's headers."""
+        remaining = headers.get("x-ratelimit-remaining")
+        limit = headers.get("x-ratelimit-limit")
+        reset = headers.get("x-ratelimit-reset")
+        with self._lock:
+            if remaining is not None:
+                self.remaining = int(remaining)
+            if limit is not None:
+                self.limit = int(limit)
+            if reset is not None:
+                self.reset_at = float(reset)
+
+    def reserve(self, mutation=False):
+        """Claim the next request slot; return the seconds to wait before sending."""
+        with self._lock:
+            now = time.time()
+            delay = max(0.0, self._paused_until - now)
+
+            # Out of primary budget: nothing goes out before the reset
+            if self.remaining is not None and self.remaining <= 0 and self.reset_at:
+                delay = max(delay, self.reset_at - now)
+            elif self.remaining is not None:
+                self.remaining -= 1
+
+            if mutation:
+                # Allow ``burst`` mutations back to back, then one per interval
+                start = now + delay
+                due = max(self._next_mutation, start)
+                slack = (self.burst - 1) * self.mutation_interval
+                delay = max(start, due - slack) - now
+                self._next_mutation = due + self.mutation_interval
+            return delay
+
+    def pause_remaining(self):
+        with self._lock:
+            return max(0.0, self._paused_until - time.time())
+
+    def wait(self, mutation=False, is_cancelled=None):
+        """Block the calling thread until it may send a request.
+
+        A pause can last until the primary limit resets, up to an hour, so
+        with ``is_cancelled`` it is slept in short slices and
+        :class:`WaitCancelled` is raised once ``is_cancelled()`` is True.
+        """
+        self._sleep(self.reserve(mutation), is_cancelled)
+        # A throttled response may have paused everyone while we slept
+        pause = self.pause_remaining()
+        while pause > 0:
+            self._sleep(pause, is_cancelled)
+            pause = self.pause_remaining()
+
+    async def wait_async(self, mutation=False, is_cancelled=None):
+        """Coroutine version of :meth:`wait` for the async backend."""
+        await self._sleep_async(self.reserve(mutation), is_cancelled)
+        pause = self.pause_remaining()
+        while pause > 0:
+            await self._sleep_async(pause, is_cancelled)
+            pause = self.pause_remaining()
+
+    def _sleep(self, seconds, is_cancelled):
+        if is_cancelled is None:
+            time.sleep(seconds)
+            return
+        end = time.monotonic() + seconds
+        while not is_cancelled():
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, WAIT_SLICE))
+        raise WaitCancelled()
+
+    async def _sleep_async(self, seconds, is_cancelled):
+        if is_cancelled is None:
+            await asyncio.sleep(seconds)
+            return
+        end = time.monotonic() + seconds
+        while not is_cancelled():
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(min(remaining, WAIT_SLICE))
+        raise WaitCancelled()
+
+    def is_rate_limited(self, status, headers, data=None):
+        """Tell a throttled response apart from an ordinary 403."""
+        headers = headers or {}
+        if status == 429:
+            return True
+        if status != 403:
+            return False
+        if "retry-after" in headers or headers.get("x-ratelimit-remaining") == "0":
+            return True
+        message = (data or {}).get("message", "") if isinstance(data, dict) else ""
+        return "rate limit" in message.lower()
+
+    def backoff(self, headers, attempt):
+        """Pause every caller after a throttled response."""
+        headers = headers or {}
+        now = time.time()
+        with self._lock:
+            retry_after = headers.get("retry-after")
+            if retry_after is not None:
+                pause = float(retry_after)
+            elif headers.get("x-ratelimit-remaining") == "0" and self.reset_at:
+                pause = self.reset_at - now + 1
+            else:
+                # Secondary limit without a hint: GitHub asks for at least a
+                # minute, growing with each repeat
+                pause = 60.0 * 2**attempt
+
+            if headers.get("x-ratelimit-remaining") != "0":
+                # Secondary limits mean we were going too fast; ease off
+                self.mutation_interval = min(self.mutation_interval * 1.5, 60.0)
+            self._paused_until = max(self._paused_until, now + pause)
+
+    def projected_completion(self, mutations):
+        """Estimate the seconds needed to send ``mutations`` more mutations."""
+        with self._lock:
+            now = time.time()
+            start = max(0.0, self._paused_until - now)
+            backlog = max(
+                0.0,
+                self._next_mutation - now - (self.burst - 1) * self.mutation_interval,
+            )
+            seconds = max(start, backlog) + max(0, mutations - 1) * self.mutation_interval
+
+            # More work than primary budget: part of it waits for the reset
+            if self.remaining is not None and self.reset_at and mutations > self.remaining:
+                seconds = max(seconds, self.reset_at - now)
+            return seconds
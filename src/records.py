@@ -0,0 +1,102 @@
+class UserRecord:
+    """The handful of user fields the app needs, without PyGithub's baggage.
+
+    PyGithub objects each keep their raw JSON, response headers and a
+    requester reference; these slotted records keep only what the diff,
+    the lists and the mutations read, and are cheap to pass between threads.
+    """
+
+    __slots__ = ("id", "login", "is_bot")
+
+    def __init__(self, id, login, is_bot=False):
+        self.id = id
+        self.login = login
+        self.is_bot = is_bot
+
+    @classmethod
+    def from_api(cls, raw):
+        """Build a record from a REST API user object."""
+        return cls(raw["id"], raw["login"], raw.get("type") == "Bot")
+
+    @classmethod
+    def from_payload(cls, payload):
+        """Build a record from its stored payload (see :meth:`to_payload`)."""
+        return cls(**payload)
+
+    def to_payload(self):
+        return {"id": self.id, "login": self.login, "is_bot": self.is_bot}
+
+    def __repr__(self):
+        return f"UserRecord(id={self.id!r}, login={self.login!r})"
+
+
+class RepoRecord:
+    """The handful of repository fields the app needs (see :class:`UserRecord`).
+
+    ``starred_at`` is when the user starred the repository, if known.
+    """
+
+    __slots__ = (
+        "id",
+        "full_name",
+        "owner",
+        "name",
+        "is_fork",
+        "is_archived",
+        "starred_at",
+    )
+
+    def __init__(
+        self,
+        id,
+        full_name,
+        owner,
+        name,
+        is_fork=False,
+        is_archived=False,
+        starred_at=None,
+    ):
+        self.id = id
+        self.full_name = full_name
+        self.owner = owner
+        self.name = name
+        self.is_fork = is_fork
+        self.is_archived = is_archived
+        self.starred_at = starred_at
+
+    @classmethod
+    def from_api(cls, raw):
+        """Build a record from a REST API repository object."""
+        return cls(
+            raw["id"],
+            raw["full_name"],
+            raw["owner"]["login"],
+            raw["name"],
+            raw.get("fork", False),
+            raw.get("archived", False),
+        )
+
+    @classmethod
+    def from_star(cls, raw):
+        """Build a record from a star (``application/vnd.github.star+json``)."""
+        record = cls.from_api(raw["repo"])
+        record.starred_at = raw["starred_at"]
+        return record
+
+    @classmethod
+    def from_payload(cls, payload):
+        return cls(**payload)
+
+    def to_payload(self):
+        return {
+            "id": self.id,
+            "full_name": self.full_name,
+            "owner": self.owner,
+            "name": self.name,
+            "is_fork": self.is_fork,
+            "is_archived": self.is_archived,
+            "starred_at": self.starred_at,
+        }
+
+    def __repr__(self):
+        return f"RepoRecord(id={self.id!r}, full_name={self.full_name!r})"
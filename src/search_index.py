@@ -0,0 +1,109 @@
+import threading
+
+GRAM_SIZE = 3
+
+
+class SearchIndex:
+    """Case-insensitive substring index over the rows of one list.
+
+    Built once per list population (and extended as pages stream in): every
+    row's text is lowercased once and mapped in an exact-text table. The
+    trigram table, the costly part, is only filled in by :meth:`build`,
+    which :meth:`find_many` calls and a worker thread can call ahead of the
+    first search, so populating a list never waits for it. A substring query
+    only verifies the rows in its rarest trigram's posting list instead of
+    rescanning every row.
+
+    Rows are only ever appended, so a worker thread can query an index while
+    the GUI thread extends it; a repopulated list gets a fresh index.
+    """
+
+    def __init__(self, texts=()):
+        self.keys = []  # Lowercased text of every row
+        self.exact = {}  # Lowercased text -> rows
+        self.grams = {}  # Trigram -> rows containing it, in row order
+        self._indexed = 0  # Rows already split into self.grams
+        self._lock = threading.Lock()
+        self.add(texts)
+
+    def add(self, texts):
+        """Index further rows, numbered after the existing ones."""
+        self._add_keys([text.lower() for text in texts])
+
+    def without(self, rows):
+        """Return a new index over the other rows, renumbered, reusing their keys."""
+        removed = set(rows)
+        return self.reordered(row for row in range(len(self.keys)) if row not in removed)
+
+    def reordered(self, rows):
+        """Return a new index over ``rows``, numbered in the given order."""
+        index = SearchIndex()
+        index._add_keys([self.keys[row] for row in rows])
+        return index
+
+    def _add_keys(self, keys):
+        first = len(self.keys)
+        self.keys.extend(keys)
+        for row, key in enumerate(keys, first):
+            self.exact.setdefault(key, []).append(row)
+
+    def build(self):
+        """Split the rows added since the last call into the trigram table."""
+        with self._lock:
+            end = len(self.keys)
+            for row in range(self._indexed, end):
+                key = self.keys[row]
+                for gram in {key[i : i + GRAM_SIZE] for i in range(len(key) - GRAM_SIZE + 1)}:
+                    self.grams.setdefault(gram, []).append(row)
+            self._indexed = end
+
+    def rows_for(self, text):
+        """Return the rows whose text is exactly ``text`` (ignoring case)."""
+        return list(self.exact.get(text.lower(), ()))
+
+    def find(self, term):
+        return self.find_many([term])
+
+    def find_many(self, terms):
+        """Return the sorted rows whose text contains any of ``terms``.
+
+        In a list of several terms (such as pasted logins), a term that is
+        some row's whole text selects just those rows.
+        """
+        terms = {term.lower() for term in terms if term}
+        rows = set()
+        short_terms = []
+        long_terms = []
+        for term in terms:
+            exact_rows = self.rows_for(term) if len(terms) > 1 else None
+            if exact_rows:
+                rows.update(exact_rows)
+            elif len(term) < GRAM_SIZE:
+                short_terms.append(term)
+            else:
+                long_terms.append(term)
+
+        if long_terms:
+            self.build()
+            for term in long_terms:
+                rows.update(self._rows_containing(term))
+
+        if short_terms:
+            # Terms too short for the trigram table share one scan
+            rows.update(
+                row
+                for row, key in enumerate(self.keys)
+                if any(term in key for term in short_terms)
+            )
+        return sorted(rows)
+
+    def _rows_containing(self, term):
+        # Only rows holding every trigram can match; verify the rarest one's rows
+        candidates = None
+        for i in range(len(term) - GRAM_SIZE + 1):
+            posting = self.grams.get(term[i : i + GRAM_SIZE])
+            if posting is None:
+                return []
+            if candidates is None or len(posting) < len(candidates):
+                candidates = posting
+        return [row for row in candidates if term in self.keys[row]]
@@ -0,0 +1,144 @@
+import threading
+
+
+class FlightFailed(Exception):
+    """The shared fetch a caller joined ended without a result."""
+
+
+class _Flight:
+    """One in-progress fetch that concurrent callers of the same key share.
+
+    Pages are recorded as they arrive so a caller that joins late first gets
+    the pages it missed, then the rest live, all in order.
+    """
+
+    def __init__(self, on_page):
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        self.pages = []
+        self.leader_on_page = on_page
+        self.listeners = []
+        self.listener_errors = {}
+        self.value = None
+        self.failed = False
+
+    def publish(self, records, fraction):
+        with self.lock:
+            self.pages.append((records, fraction))
+            # The fetching caller's own callback may raise (e.g. cancellation)
+            if self.leader_on_page:
+                self.leader_on_page(records, fraction)
+            for listener in list(self.listeners):
+                self._notify(listener, records, fraction)
+
+    def join(self, on_page):
+        """Wait for the flight and return its value (see SingleFlightCache.get)."""
+        if on_page:
+            with self.lock:
+                for records, fraction in self.pages:
+                    self._notify(on_page, records, fraction)
+                if on_page not in self.listener_errors:
+                    self.listeners.append(on_page)
+        self.done.wait()
+        # A joiner's own callback failing must not disturb the shared fetch,
+        # so its error is raised here, in the joiner's thread
+        if on_page in self.listener_errors:
+            raise self.listener_errors[on_page]
+        if self.failed:
+            raise FlightFailed()
+        return self.value
+
+    def finish(self, value=None, failed=False):
+        with self.lock:
+            self.value = value
+            self.failed = failed
+        self.done.set()
+
+    def _notify(self, listener, records, fraction):
+        # Called with self.lock held
+        try:
+            listener(records, fraction)
+        except Exception as e:
+            self.listener_errors[listener] = e
+            if listener in self.listeners:
+                self.listeners.remove(listener)
+
+
+class SingleFlightCache:
+    """Thread-safe in-memory cache that fetches each missing key only once.
+
+    When several threads ask for the same missing key, the first one loads it
+    and the others wait for that same load (receiving its pages as they
+    arrive) instead of starting their own. :meth:`forget` drops a key; a load
+    that was already running when its key was forgotten still answers its
+    callers but is not cached.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+        self._flights = {}
+        self._generations = {}
+
+    def get(self, key, load, on_page=None):
+        """Return the value for ``key``, loading it with ``load(on_page)`` on a miss.
+
+        ``on_page(records, fraction)`` sees every page of the load (or the
+        whole cached value once, at fraction 1.0).
+        """
+        # If a joined fetch fails and this caller fetches again, the pages it
+        # already received are not passed to on_page a second time
+        delivered = 0
+        position = 0
+
+        def page_once(records, fraction):
+            nonlocal delivered, position
+            position += 1
+            if position > delivered:
+                delivered = position
+                on_page(records, fraction)
+
+        while True:
+            position = 0
+            with self._lock:
+                value = self._values.get(key)
+                flight = self._flights.get(key)
+                leader = value is None and flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight(on_page and page_once)
+                    generation = self._generations.get(key, 0)
+
+            if value is not None:
+                if on_page:
+                    on_page(value, 1.0)
+                return value
+
+            if not leader:
+                try:
+                    return flight.join(on_page and page_once)
+                except FlightFailed:
+                    # The caller that was fetching failed or was cancelled;
+                    # try again, this time possibly as the one fetching
+                    continue
+
+            try:
+                value = load(flight.publish)
+            except BaseException:
+                with self._lock:
+                    del self._flights[key]
+                flight.finish(failed=True)
+                raise
+            with self._lock:
+                del self._flights[key]
+                if self._generations.get(key, 0) == generation:
+                    self._values[key] = value
+            flight.finish(value)
+            return value
+
+    def forget(self, key=None):
+        """Drop one key, or every key when ``key`` is None."""
+        with self._lock:
+            keys = list(self._values) + list(self._flights) if key is None else [key]
+            for k in keys:
+                self._values.pop(k, None)
+                self._generations[k] = self._generations.get(k, 0) + 1
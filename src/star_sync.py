@@ -0,0 +1,114 @@
+from metrics import Metrics
+from records import RepoRecord
+
+# Media type that wraps each starred repository with the time it was starred
+STAR_HEADERS = {"Accept": "application/vnd.github.star+json"}
+
+
+def star_payload(raw):
+    """Trim a star (repository plus ``starred_at``) to its record payload."""
+    return RepoRecord.from_star(raw).to_payload()
+
+
+class StarSync:
+    """Bring a stored copy of the starred repositories up to date cheaply.
+
+    ``/user/starred`` lists stars newest first. A one-item page tells us the
+    current number of stars (its last page number) and the newest star, so
+    an unchanged list costs a single request. Otherwise pages are read from
+    the top until a star that is already stored (same repository, same
+    ``starred_at``) turns up; everything below it is known.
+
+    If the count then shows that stars were removed elsewhere, a binary
+    search over the pages finds the first one that no longer matches, and
+    only the pages from there on are fetched again.
+
+    ``request_page(page, per_page, is_cancelled)`` must return
+    ``(raw_stars, last_page)`` for one page in the star media type.
+    """
+
+    def __init__(self, request_page, per_page=100, metrics=None):
+        self.request_page = request_page
+        self.per_page = per_page
+        self.metrics = metrics or Metrics()
+
+    def sync(self, stored, is_cancelled=None):
+        """Return the current star payloads, or None if a full fetch is needed.
+
+        ``stored`` are the payloads of the previous sync, newest first.
+        """
+        if any(payload.get("starred_at") is None for payload in stored):
+            # Saved without star times (e.g. fetched over GraphQL)
+            return None
+        known = {payload["id"]: payload["starred_at"] for payload in stored}
+
+        newest, total = self.request_page(1, 1, is_cancelled)
+        total = total if newest else 0
+        if total == len(stored) and (not newest or _is_known(newest[0], known)):
+            self.metrics.incr("star_sync_total", result="unchanged")
+            return stored
+
+        new = self._new_stars(known, is_cancelled)
+        new_ids = {payload["id"] for payload in new}
+        # A repository starred again moves to the top with a new time
+        merged = new + [payload for payload in stored if payload["id"] not in new_ids]
+        if len(merged) == total:
+            self.metrics.incr("star_sync_total", result="incremental")
+            return merged
+        if len(merged) < total:
+            # More stars than we can account for; the stored copy is unreliable
+            self.metrics.incr("star_sync_total", result="full")
+            return None
+        self.metrics.incr("star_sync_total", result="reconciled")
+        return self._reconcile(merged, total, is_cancelled)
+
+    def _new_stars(self, known, is_cancelled=None):
+        """Return the stars newer than the newest stored one, newest first."""
+        new = []
+        page = 1
+        while True:
+            stars, last_page = self.request_page(page, self.per_page, is_cancelled)
+            for raw in stars:
+                if _is_known(raw, known):
+                    return new
+                new.append(star_payload(raw))
+            if page >= last_page or not stars:
+                return new
+            page += 1
+
+    def _reconcile(self, merged, total, is_cancelled=None):
+        """Drop stars removed elsewhere from ``merged`` by refetching its changed tail."""
+        per_page = self.per_page
+        pages = -(-total // per_page)
+        fetched = {}
+
+        # A page matches its slice of ``merged`` only if nothing before its
+        # end was removed, so the first mismatch can be binary searched
+        low, high = 1, pages + 1
+        while low < high:
+            middle = (low + high) // 2
+            stars, _ = self.request_page(middle, per_page, is_cancelled)
+            fetched[middle] = stars
+            start = (middle - 1) * per_page
+            expected = [payload["id"] for payload in merged[start : start + len(stars)]]
+            if [raw["repo"]["id"] for raw in stars] == expected:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low > pages:
+            # Every page matched: the removed stars were the oldest ones
+            return merged[:total]
+        payloads = merged[: (low - 1) * per_page]
+        for page in range(low, pages + 1):
+            stars = (
+                fetched[page]
+                if page in fetched
+                else self.request_page(page, per_page, is_cancelled)[0]
+            )
+            payloads.extend(star_payload(raw) for raw in stars)
+        return payloads
+
+
+def _is_known(raw, known):
+    return known.get(raw["repo"]["id"]) == raw["starred_at"]
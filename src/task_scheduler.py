@@ -0,0 +1,134 @@
+from abc import ABCMeta, abstractmethod
+from contextlib import nullcontext
+import threading
+import time
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from rate_limiter import WaitCancelled
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task by :meth:`Task.check_cancelled` to stop it early."""
+
+
+class _TaskMeta(type(QObject), ABCMeta):
+    # QObject's metaclass and ABCMeta combined, so abstract tasks cannot be built
+    pass
+
+
+class Task(QObject, metaclass=_TaskMeta):
+    """A background job run by :class:`TaskScheduler`.
+
+    Subclasses implement :meth:`work`, emit their own result and progress
+    signals from it, and call :meth:`check_cancelled` (or pass
+    :meth:`is_cancelled` down) at points where stopping is safe. The task
+    object lives on the GUI thread, so its signals reach slots there queued.
+
+    Short jobs the user is waiting on (such as a search) set ``interactive``
+    so they never queue behind long fetches and bulk actions.
+    """
+
+    interactive = False
+
+    done = pyqtSignal()  # Emitted last, however the task ended
+    failed = pyqtSignal(str)  # Error message of an unexpected exception
+    cancelled = pyqtSignal()
+
+    def __init__(self, name):
+        super().__init__()
+        self.name = name
+        self._cancel = threading.Event()
+
+    @abstractmethod
+    def work(self):
+        """Do the job on a pool thread; every subclass implements this."""
+
+    def cancel(self):
+        self._cancel.set()
+
+    def is_cancelled(self):
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise TaskCancelled()
+
+
+class _TaskRunnable(QRunnable):
+    def __init__(self, task, metrics=None):
+        super().__init__()
+        self.task = task
+        self.metrics = metrics
+
+    def run(self):
+        task = self.task
+        operation = self.metrics.operation(task.name) if self.metrics else nullcontext()
+        try:
+            with operation:
+                task.work()
+        except (TaskCancelled, WaitCancelled):
+            # WaitCancelled: the task was cancelled while waiting for the rate limits
+            task.cancelled.emit()
+        except Exception as e:
+            print(f"Error in task {task.name}: {e}")
+            task.failed.emit(str(e))
+        finally:
+            task.done.emit()
+
+
+class TaskScheduler(QObject):
+    """Run every background job on bounded thread pools.
+
+    Interactive tasks get a small pool of their own; every other task shares
+    the main pool, where a bulk action paced by the rate limits can hold a
+    thread for hours. Tasks are registered by name while they run, so starting a second task
+    with the same name is refused instead of replacing a live worker, and
+    running tasks can be looked up and cancelled. With ``metrics`` each run
+    is recorded as an operation under the task's name.
+    """
+
+    task_finished = pyqtSignal(str)  # Name of a task that has just ended
+
+    def __init__(self, max_threads=4, parent=None, metrics=None, interactive_threads=2):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self.interactive_pool = QThreadPool(self)
+        self.interactive_pool.setMaxThreadCount(interactive_threads)
+        self.metrics = metrics
+        self.tasks = {}  # Name -> running task; only touched on the GUI thread
+
+    def start(self, task):
+        """Queue ``task``; returns False if a task with its name is running."""
+        if task.name in self.tasks:
+            return False
+        self.tasks[task.name] = task
+        task.done.connect(lambda: self._finish(task.name))
+        pool = self.interactive_pool if task.interactive else self.pool
+        pool.start(_TaskRunnable(task, self.metrics))
+        return True
+
+    def _finish(self, name):
+        self.tasks.pop(name, None)
+        self.task_finished.emit(name)
+
+    def is_running(self, name):
+        return name in self.tasks
+
+    def cancel(self, name):
+        task = self.tasks.get(name)
+        if task is not None:
+            task.cancel()
+
+    def cancel_all(self):
+        for task in self.tasks.values():
+            task.cancel()
+
+    def wait(self, msecs=-1):
+        """Block until every queued task has finished (e.g. on shutdown)."""
+        start = time.monotonic()
+        done = self.pool.waitForDone(msecs)
+        if msecs >= 0:
+            msecs = max(0, msecs - int((time.monotonic() - start) * 1000))
+        return self.interactive_pool.waitForDone(msecs) and done
@@ -0,0 +1,152 @@
+from urllib.parse import urlparse
+import random
+
+from github.Requester import Requester, RequestsResponse
+from metrics import Metrics
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Methods that can be sent again without changing the outcome; follow,
+# unfollow and unstar are PUT/DELETE and therefore safe to repeat
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+# Server errors worth another try; rate limits (403/429) are left to the scheduler
+RETRY_STATUSES = (500, 502, 503, 504)
+
+
+def backoff_delay(backoff, attempt):
+    """Seconds to wait before retry ``attempt`` (from 0): doubling, plus jitter."""
+    return backoff * 2**attempt + random.uniform(0, backoff)
+
+
+class CountingRetry(Retry):
+    """urllib3 retry policy that reports every retry it makes to ``metrics``."""
+
+    def __init__(self, metrics=None, **kwargs):
+        self.metrics = metrics
+        super().__init__(**kwargs)
+
+    def new(self, **kwargs):
+        retry = super().new(**kwargs)
+        retry.metrics = self.metrics
+        return retry
+
+    def increment(self, method=None, url=None, response=None, error=None, **kwargs):
+        # Raises once the retries are used up, so only actual retries are counted
+        retry = super().increment(method, url, response, error, **kwargs)
+        if self.metrics is not None:
+            if response is not None:
+                reason = str(response.status)
+            else:
+                reason = type(error).__name__
+            self.metrics.incr("http_retries_total", method=method or "", reason=reason)
+        return retry
+
+
+class Transport:
+    """One keep-alive connection pool shared by every Requester of a manager.
+
+    PyGithub gives each Requester its own ``requests.Session``, and the
+    manager makes one Requester per worker thread, so every short-lived
+    thread would open (and TLS-handshake) connections of its own. Here all
+    Requesters send through a single session instead: its pool holds up to
+    ``pool_size`` connections and threads wait for a free one rather than
+    opening extras. Responses are gzip-compressed, every request has a
+    timeout, and connection failures and 5xx answers of idempotent requests
+    are retried with exponential, jittered backoff.
+    """
+
+    def __init__(
+        self, base_url, pool_size=16, timeout=15, retries=3, backoff=0.5, metrics=None
+    ):
+        url = urlparse(base_url)
+        self.scheme = url.scheme
+        self.host = url.hostname
+        self.port = url.port
+        self.timeout = timeout
+        self.metrics = metrics or Metrics()
+        self.retry = CountingRetry(
+            metrics=self.metrics,
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            allowed_methods=IDEMPOTENT_METHODS,
+            status_forcelist=RETRY_STATUSES,
+            backoff_factor=backoff,
+            backoff_jitter=backoff,
+            # Hand the last 5xx to PyGithub, which turns it into a GithubException
+            raise_on_status=False,
+        )
+        self.adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            pool_block=True,
+            max_retries=self.retry,
+        )
+        self.session = requests.Session()
+        # Like PyGithub: never fall back to credentials from .netrc
+        self.session.auth = Requester.noopAuth
+        self.session.headers["Accept-Encoding"] = "gzip, deflate"
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+
+        self.metrics.gauge("http_pool_size", lambda: pool_size)
+        self.metrics.gauge("http_timeout_seconds", lambda: timeout)
+        self.metrics.gauge("http_connections_opened", self.connections_opened)
+
+    def attach(self, requester):
+        """Make ``requester`` send through the shared pool; returns it."""
+        # PyGithub 2.x has no public hook for a Requester's connection, and
+        # only creates one itself while this attribute is still None
+        requester._Requester__connection = _PooledConnection(self)
+        return requester
+
+    def connections_opened(self):
+        """Connections opened so far; stays low when keep-alive works."""
+        pools = self.adapter.poolmanager.pools
+        return sum(
+            pool.num_connections
+            for pool in map(pools.get, pools.keys())
+            if pool is not None
+        )
+
+    def close(self):
+        self.session.close()
+
+
+class _PooledConnection:
+    """Per-Requester stand-in for PyGithub's connection object.
+
+    PyGithub calls ``request`` and then ``getresponse`` on it, so it keeps
+    the pending request and must not be shared between threads; the
+    session (and its pool) behind it is.
+    """
+
+    def __init__(self, transport):
+        self.transport = transport
+        port = f":{transport.port}" if transport.port else ""
+        self.origin = f"{transport.scheme}://{transport.host}{port}"
+
+    def request(self, verb, url, input, headers):
+        self.verb = verb
+        self.url = url
+        self.input = input
+        self.headers = headers
+
+    def getresponse(self):
+        response = self.transport.session.request(
+            self.verb,
+            self.origin + self.url,
+            headers=self.headers,
+            data=self.input,
+            timeout=self.transport.timeout,
+            allow_redirects=False,
+        )
+        # Bytes as received, before gzip decoding
+        self.transport.metrics.incr("api_wire_bytes_total", response.raw.tell())
+        return RequestsResponse(response)
+
+    def close(self):
+        # The pool outlives any one Requester
+        pass
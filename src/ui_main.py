@@ -1,7 +1,7 @@
 from PyQt5.QtWidgets import (
     QApplication,
     QMainWindow,
-    QListWidget,
+    QListView,
     QVBoxLayout,
     QHBoxLayout,
     QWidget,
@@ -10,160 +10,444 @@ from PyQt5.QtWidgets import (
     QLineEdit,
     QAbstractItemView,
     QMessageBox,
-    QCheckBox,
     QSpacerItem,
     QSizePolicy,
+    QProgressBar,
+)
+from PyQt5.QtCore import (
+    Qt,
+    QTimer,
+    pyqtSignal,
+    QItemSelection,
+    QItemSelectionModel,
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QItemSelection
 from github_api import GitHubManager
-
-
-class NonFollowerFetchThread(QThread):
+from diff_engine import IncrementalDiff
+from exclusions import ExclusionError
+from list_models import RecordListModel, contiguous_ranges
+from task_scheduler import Task, TaskScheduler
+
+# How long typing has to pause before the search bar looks up matches
+SEARCH_DEBOUNCE_MS = 250
+# How often the API usage line under the status label is refreshed
+METRICS_REFRESH_MS = 1000
+# Background jobs (fetches, bulk actions) that may run at once
+MAX_TASK_THREADS = 4
+# Searches and index builds, on threads of their own so they never wait for the above
+MAX_INTERACTIVE_THREADS = 2
+
+
+def format_progress(action, done, total, seconds_left):
+    """Build a status line such as "Unfollowing 40/200 (about 2m 40s left)"."""
+    minutes, seconds = divmod(int(seconds_left), 60)
+    eta = f"{minutes}m {seconds}s" if minutes else f"{seconds}s"
+    return f"{action} {done}/{total} (about {eta} left)"
+
+
+def parse_search_terms(text):
+    """Split comma-separated search input into terms; plain input is one term."""
+    if "," in text:
+        return [term.strip() for term in text.split(",") if term.strip()]
+    return [text] if text else []
+
+
+def selection_size(selection):
+    """Count the rows in a single-column ``QItemSelection`` from its ranges."""
+    return sum(selection_range.height() for selection_range in selection)
+
+
+def apply_records(model, records):
+    """Bring ``model`` in line with ``records``, touching only the rows that changed."""
+    fresh_ids = {record.id for record in records}
+    current = model.records()
+    model.remove_rows(
+        [row for row, record in enumerate(current) if record.id not in fresh_ids]
+    )
+    known_ids = {record.id for record in current}
+    model.append_records([record for record in records if record.id not in known_ids])
+
+
+def create_list_view(model, selection_mode=QAbstractItemView.MultiSelection):
+    """Build a list view over ``model`` that stays fast at 100k+ rows."""
+    view = QListView()
+    view.setModel(model)
+    # Every row is one line of text, so Qt can skip per-row size queries
+    view.setUniformItemSizes(True)
+    view.setSelectionMode(selection_mode)
+    return view
+
+
+class NonFollowerFetchTask(Task):
     # Define custom signals to emit the results once the work is done
     finished = pyqtSignal(list, list, list)  # Non-followers, following, followers
+    # Incremental results while the lists are still being paged
+    batch = pyqtSignal(list)  # Non-followers found in the latest page
+    counts = pyqtSignal(int, int, int)  # Following, followers, non-followers so far
+    progress = pyqtSignal(float)  # Fraction of the fetch that is done
 
-    def __init__(self, github_manager, exclude_list):
-        super().__init__()
+    def __init__(self, github_manager, excluded_users):
+        super().__init__("non_followers")
         self.github_manager = github_manager
-        self.exclude_list = exclude_list
+        self.excluded_users = excluded_users  # Compiled user exception rules
 
-    def run(self):
-        # Fetch the data in this thread (instead of blocking the main thread)
-        following = self.github_manager.get_following()
-        followers = self.github_manager.get_followers()
-        non_followers = self.github_manager.get_non_followers(self.exclude_list)
+    def work(self):
+        self.following_count = 0
+        self.followers_count = 0
+        self.non_followers = []
 
-        # Sort the users based on login names (or any other criteria)
-        following = sorted(following, key=lambda user: user.login.lower())
-        followers = sorted(followers, key=lambda user: user.login.lower())
-        non_followers = sorted(non_followers, key=lambda user: user.login.lower())
+        # Index every follower first, then stream non-followers page by page
+        # while following is paged (instead of blocking the GUI thread)
+        followers = self.github_manager.get_followers(
+            on_page=self.on_followers_page, is_cancelled=self.is_cancelled
+        )
+        self.diff = IncrementalDiff(followers, self.excluded_users)
+        following = self.github_manager.get_following(
+            on_page=self.on_following_page, is_cancelled=self.is_cancelled
+        )
 
-        # Emit the results back to the main thread
-        self.finished.emit(non_followers, following, followers)
+        # Emit the results back to the GUI thread, which sorts the streamed rows
+        self.finished.emit(self.non_followers, following, followers)
+
+    def on_followers_page(self, users, fraction):
+        # Page boundaries are safe points to stop at
+        self.check_cancelled()
+        self.followers_count += len(users)
+        self.emit_counts()
+        self.progress.emit(fraction / 2)
+
+    def on_following_page(self, users, fraction):
+        self.check_cancelled()
+        found = self.diff.missing(users)
+        self.non_followers.extend(found)
+        self.following_count += len(users)
+        if found:
+            self.batch.emit(found)
+        self.emit_counts()
+        self.progress.emit(0.5 + fraction / 2)
+
+    def emit_counts(self):
+        self.counts.emit(
+            self.following_count, self.followers_count, len(self.non_followers)
+        )
 
 
-class UnFollowthread(QThread):
+class UnfollowTask(Task):
     # Signal to emit the count of users unfollowed once the process is complete
     unfollow_complete = pyqtSignal(int)
+    progress = pyqtSignal(str)  # Status line with the projected completion time
 
-    def __init__(self, github_manager, exclude_list):
-        super().__init__()
+    def __init__(self, github_manager, excluded_users):
+        super().__init__("unfollow")
         self.github_manager = github_manager
-        self.exclude_list = exclude_list
-
-    def run(self):
-        # Get non-followers from the manager
-        non_followers = self.github_manager.get_non_followers(self.exclude_list)
-
-        # Count the number of users unfollowed
-        unfollowed_count = 0
+        self.excluded_users = excluded_users
+
+    def work(self):
+        # Finish an interrupted run first: its journaled plan needs no refetch
+        non_followers = self.github_manager.pending_plan("unfollow")
+        if non_followers is not None:
+            non_followers = self.excluded_users.filter(
+                non_followers, lambda user: user.login
+            )
+        else:
+            # Get non-followers from the manager
+            non_followers = self.github_manager.get_non_followers(
+                self.excluded_users, is_cancelled=self.is_cancelled
+            )
 
-        # Unfollow each non-follower
-        for user in non_followers:
-            self.github_manager.unfollow(user)
-            unfollowed_count += 1
+        # Unfollow every non-follower in one bulk call; a cancelled run stops
+        # between users and leaves the rest in the journal
+        unfollowed_count = self.github_manager.unfollow_many(
+            non_followers,
+            on_progress=self.report_progress,
+            is_cancelled=self.is_cancelled,
+        )
+        self.check_cancelled()
 
         # Emit the signal with the unfollowed count
         self.unfollow_complete.emit(unfollowed_count)
 
+    def report_progress(self, done, total):
+        eta = self.github_manager.projected_completion(total - done)
+        self.progress.emit(format_progress("Unfollowing", done, total, eta))
 
-class NonFollowedFollowersFetchThread(QThread):
+
+class NonFollowedFollowersFetchTask(Task):
     finished = pyqtSignal(list)  # Signal to emit the list of non-followed followers
+    batch = pyqtSignal(list)  # Non-followed followers found in the latest page
+    progress = pyqtSignal(float)  # Fraction of the fetch that is done
 
     def __init__(self, github_manager):
-        super().__init__()
+        super().__init__("non_followed_followers")
         self.github_manager = github_manager  # Store the GitHub manager for API calls
 
-    def run(self):
-        # Fetch followers and following lists
-        followers = self.github_manager.get_followers()
-        following = self.github_manager.get_following()
+    def work(self):
+        self.non_followed_followers = []
 
-        # Find users who follow you but whom you are not following back
-        non_followed_followers = [
-            f for f in followers if f.login not in {u.login for u in following}
-        ]
+        # Index who you follow, then stream the followers you don't follow back
+        following = self.github_manager.get_following(
+            on_page=self.on_following_page, is_cancelled=self.is_cancelled
+        )
+        self.diff = IncrementalDiff(following)
+        self.github_manager.get_followers(
+            on_page=self.on_followers_page, is_cancelled=self.is_cancelled
+        )
 
         # Emit the results when done
-        self.finished.emit(non_followed_followers)
+        self.finished.emit(self.non_followed_followers)
+
+    def on_following_page(self, users, fraction):
+        self.check_cancelled()
+        self.progress.emit(fraction / 2)
+
+    def on_followers_page(self, users, fraction):
+        self.check_cancelled()
+        found = self.diff.missing(users)
+        self.non_followed_followers.extend(found)
+        if found:
+            self.batch.emit(found)
+        self.progress.emit(0.5 + fraction / 2)
 
 
-class FollowBackThread(QThread):
+class FollowBackTask(Task):
     # Signal to emit the count of users followed back when the process is complete
     finished = pyqtSignal(int)  # Signal to emit the number of users followed
+    progress = pyqtSignal(str)  # Status line with the projected completion time
 
-    def __init__(self, github_manager, followers, following):
-        super().__init__()
+    def __init__(self, github_manager, excluded_users, users=None):
+        super().__init__("follow_back")
         self.github_manager = github_manager
-        self.followers = followers
-        self.following = following
-
-    def run(self):
-        # Convert to sets of usernames for easier comparison
-        followers_set = set(user.login for user in self.followers)
-        following_set = set(user.login for user in self.following)
-
-        # Find the followers you're not following back
-        to_follow_back = followers_set - following_set
-
-        # Follow back each user
-        followed_count = 0
-        for user_login in to_follow_back:
-            user = self.github_manager.g.get_user(user_login)
-            self.github_manager.follow(user)
-            followed_count += 1
+        self.excluded_users = excluded_users  # Compiled user exception rules
+        self.users = users  # Users found by the "Find" step, if it has run
+
+    def work(self):
+        # Find the followers you're not following back, unless we already know
+        # (or an interrupted run left a journaled plan)
+        users = self.github_manager.pending_plan("follow")
+        if users is None:
+            users = self.users
+        if users is None:
+            users = self.github_manager.get_relationship_diff(
+                is_cancelled=self.is_cancelled
+            ).non_followed_followers
+        # Leave users matching an exception alone, as the command line does
+        users = self.excluded_users.filter(users, lambda user: user.login)
+
+        # Follow back every user by login, with no per-user lookup
+        followed_count = self.github_manager.follow_many(
+            users, on_progress=self.report_progress, is_cancelled=self.is_cancelled
+        )
+        self.check_cancelled()
 
         # Emit the number of users followed back
         self.finished.emit(followed_count)
 
+    def report_progress(self, done, total):
+        eta = self.github_manager.projected_completion(total - done)
+        self.progress.emit(format_progress("Following back", done, total, eta))
+
 
-class RepoFetchWorkerThread(QThread):
+class RepoFetchTask(Task):
     finished = pyqtSignal(list)  # Signal to emit the list of starred repos
+    batch = pyqtSignal(list)  # Starred repos from the latest page
+    progress = pyqtSignal(float)  # Fraction of the fetch that is done
 
     def __init__(self, github_manager):
-        super().__init__()
+        super().__init__("repos")
         self.github_manager = github_manager
 
-    def run(self):
-        # Fetch starred repos fro mthe GitHub API
-        repos = self.github_manager.get_starred_repos()
+    def work(self):
+        # Fetch starred repos from the GitHub API, streaming each page
+        repos = self.github_manager.get_starred_repos(
+            on_page=self.on_page, is_cancelled=self.is_cancelled
+        )
         self.finished.emit(repos)
 
+    def on_page(self, repos, fraction):
+        self.check_cancelled()
+        self.batch.emit(repos)
+        self.progress.emit(fraction)
 
-class UnstarReposWorkerThread(QThread):
+
+class UnstarReposTask(Task):
     finished = pyqtSignal(int)  # Signal to emit the count of unstarred repos
+    progress = pyqtSignal(str)  # Status line with the projected completion time
 
-    def __init__(self, github_manager, all_repos, repo_exclude_list):
-        super().__init__()
+    def __init__(self, github_manager, all_repos, excluded_repos):
+        super().__init__("unstar")
         self.github_manager = github_manager
-        self.all_repos = all_repos  # All repos in the listbox
-        self.repo_exclude_list = repo_exclude_list  # Repos to exclude from unstarring
+        self.all_repos = all_repos  # Repos fetched for the listbox
+        self.excluded_repos = excluded_repos  # Compiled repo exception rules
+
+    def work(self):
+        # Skip repositories matching an exception; the rest are unstarred
+        # by owner/name directly, with no per-repo lookup
+        repos = self.github_manager.pending_plan("unstar")
+        if repos is None:
+            repos = self.all_repos
+        repos = self.excluded_repos.filter(repos, lambda repo: repo.full_name)
+
+        # Unstar everything that's left in one bulk call
+        unstarred_count = self.github_manager.unstar_many(
+            repos, on_progress=self.report_progress, is_cancelled=self.is_cancelled
+        )
+        self.check_cancelled()
+        self.finished.emit(unstarred_count)
 
-    def run(self):
-        unstarred_count = 0
+    def report_progress(self, done, total):
+        eta = self.github_manager.projected_completion(total - done)
+        self.progress.emit(format_progress("Unstarring", done, total, eta))
 
-        for repo_name in self.all_repos:
-            # Skip repositories that are in the exclude list
-            if repo_name in self.repo_exclude_list:
-                continue
 
-            repo = self.github_manager.get_repo_by_name(repo_name)
-            if repo:
-                self.github_manager.unstar_repo(repo)
-                unstarred_count += 1
+class AccountCheckTask(Task):
+    finished = pyqtSignal(bool)  # Whether stored data of another account was dropped
 
-        self.finished.emit(unstarred_count)
+    def __init__(self, github_manager):
+        super().__init__("account_check")
+        self.github_manager = github_manager
+
+    def work(self):
+        self.github_manager.check_account(self.is_cancelled)
+        self.finished.emit(self.github_manager.account_reset)
+
+
+class SessionRefreshTask(Task):
+    finished = pyqtSignal(dict)  # Fresh records for each restored list, plus counts
+
+    def __init__(self, github_manager, lists, excluded_users):
+        super().__init__("session_refresh")
+        self.github_manager = github_manager
+        self.lists = lists  # Restored lists to bring up to date
+        self.excluded_users = excluded_users
+
+    def work(self):
+        users_needed = "non_followers" in self.lists or "to_follow" in self.lists
+        names = (["following", "followers"] if users_needed else []) + (
+            ["starred"] if "repos" in self.lists else []
+        )
+        # Revalidate instead of trusting the TTL; unchanged pages come back as 304s
+        self.github_manager.expire_cache(names)
+
+        result = {}
+        try:
+            if users_needed:
+                diff = self.github_manager.get_relationship_diff(
+                    self.excluded_users, is_cancelled=self.is_cancelled
+                )
+                result["counts"] = {
+                    "following": len(diff.following),
+                    "followers": len(diff.followers),
+                }
+                result["non_followers"] = sorted(
+                    diff.non_followers, key=lambda user: user.login.lower()
+                )
+                result["to_follow"] = diff.non_followed_followers
+            if "repos" in self.lists:
+                result["repos"] = self.github_manager.get_starred_repos(
+                    is_cancelled=self.is_cancelled
+                )
+        except Exception as e:
+            print(f"Error revalidating the last session: {e}")
+        self.finished.emit(result)
+
+
+class SearchTask(Task):
+    finished = pyqtSignal(str, list, list)  # Query text, model generations, rows per model
+    interactive = True
+
+    def __init__(self, text, models):
+        super().__init__("search")
+        self.text = text
+        # Capture the indexes now; a repopulated model swaps in a new one
+        self.indexes = [model.search_index for model in models]
+        self.generations = [model.generation for model in models]
+
+    def work(self):
+        terms = parse_search_terms(self.text)
+        matches = [index.find_many(terms) for index in self.indexes]
+        self.finished.emit(self.text, self.generations, matches)
+
+
+class IndexTask(Task):
+    """Build the substring tables of the lists' search indexes before the first search."""
+
+    interactive = True
+
+    def __init__(self, models):
+        super().__init__("index")
+        self.models = models
+
+    def work(self):
+        while True:
+            indexes = [model.search_index for model in self.models]
+            for index in indexes:
+                self.check_cancelled()
+                index.build()
+            # A list repopulated meanwhile has swapped in a new index; build that too
+            if [model.search_index for model in self.models] == indexes:
+                return
 
 
 class MainWindow(QMainWindow):
     def __init__(self, github_manager):
         super().__init__()
         self.github_manager = github_manager
-        self.exclude_list = []  # List of users to exclude
-        self.repo_exclude_list = []
+        # User and repository exceptions, saved whenever they change
+        try:
+            self.exclusions = github_manager.load_exclude_list()
+        except ExclusionError as e:
+            # Never offer bulk actions without the exceptions that protect accounts
+            QMessageBox.critical(
+                None, "FollowEqualizer", f"{e}\n\nFix or remove the file and start again."
+            )
+            raise SystemExit(1)
         self.non_followers = []  # Store non-followers to use in search functionality
+        self.non_followed_followers = None  # Users found by "Find Non-Followed Followers"
+        self.fetched_lists = set()  # Lists shown this session, saved in the snapshot
+        self.refreshing_lists = set()  # Restored lists still awaiting revalidation
+        self.following_count = 0
+        self.followers_count = 0
+        self.last_operation = None  # Name of the last finished task, for its metrics
+
+        # Models behind the list views; they hold the fetched records themselves
+        self.non_follower_model = RecordListModel(lambda user: user.login)
+        self.to_follow_model = RecordListModel(lambda user: user.login)
+        self.repo_model = RecordListModel(lambda repo: repo.full_name)
+        self.exclude_model = RecordListModel()
+        self.exclude_model.set_records(self.exclusions.rules())
+
+        # Selected row count per list view, kept up to date from selection deltas
+        self.selected_counts = {}
+
+        # Every fetch, bulk action and search runs here, never on the GUI thread
+        self.tasks = TaskScheduler(
+            MAX_TASK_THREADS,
+            self,
+            metrics=github_manager.metrics,
+            interactive_threads=MAX_INTERACTIVE_THREADS,
+        )
+        self.tasks.task_finished.connect(self.on_task_finished)
+        for model in (self.non_follower_model, self.to_follow_model, self.repo_model):
+            model.reindexed.connect(self.start_indexing)
+
+        # Matches for the search bar's text, looked up off the GUI thread
+        self.search_matches = None  # (text, generations, rows per list) or None
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.start_search)
         self.init_ui()
 
+        # Confirm who is signed in off the GUI thread; until then the restored
+        # lists are read-only and no interrupted job is offered for resuming
+        self.set_bulk_actions_enabled(False)
+        task = AccountCheckTask(github_manager)
+        task.finished.connect(self.on_account_checked)
+        task.failed.connect(lambda message: self.set_bulk_actions_enabled(True))
+        self.tasks.start(task)
+
+        # Show the last session's results as soon as the window is up
+        QTimer.singleShot(0, self.restore_session)
+
     def init_ui(self):
         self.setWindowTitle("FollowEqualizer")
 
@@ -177,6 +461,20 @@ class MainWindow(QMainWindow):
         self.status_label = QLabel("Ready")
         main_layout.addWidget(self.status_label)
 
+        # Live API usage: requests, pages, bytes, cache hits and rate budget
+        self.metrics_label = QLabel(self.github_manager.metrics.summary())
+        main_layout.addWidget(self.metrics_label)
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.setInterval(METRICS_REFRESH_MS)
+        self.metrics_timer.timeout.connect(self.update_metrics_label)
+        self.metrics_timer.start()
+
+        # Progress of the current fetch, filled in as pages arrive
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setValue(0)
+        main_layout.addWidget(self.progress_bar)
+
         # Add vertical space between status label and follower/following stats
         main_layout.addSpacerItem(
             QSpacerItem(20, 10, QSizePolicy.Minimum, QSizePolicy.Fixed)
@@ -197,8 +495,15 @@ class MainWindow(QMainWindow):
             QSpacerItem(20, 10, QSizePolicy.Minimum, QSizePolicy.Fixed)
         )
 
-        self.clear_cache_checkbox = QCheckBox("Clear Cache")
-        main_layout.addWidget(self.clear_cache_checkbox)
+        # Drops the local cache so the next fetch goes back to GitHub
+        self.refresh_data_button = QPushButton("Refresh Data")
+        self.refresh_data_button.clicked.connect(self.refresh_data)
+        main_layout.addWidget(self.refresh_data_button)
+
+        # Stops running fetches and bulk actions at their next safe point
+        self.cancel_button = QPushButton("Cancel Running Tasks")
+        self.cancel_button.clicked.connect(self.tasks.cancel_all)
+        main_layout.addWidget(self.cancel_button)
 
         main_layout.addSpacerItem(
             QSpacerItem(20, 10, QSizePolicy.Minimum, QSizePolicy.Expanding)
@@ -207,8 +512,7 @@ class MainWindow(QMainWindow):
         ### NON-FOLLOWERS SECTION ###
         # Create a vertical layout for the Non-Followers list and its buttons
         non_followers_layout = QVBoxLayout()
-        self.non_follower_list = QListWidget()
-        self.non_follower_list.setSelectionMode(QAbstractItemView.MultiSelection)
+        self.non_follower_list = create_list_view(self.non_follower_model)
         self.non_follower_list.setFixedHeight(
             250
         )  # Ensure all list boxes are the same height
@@ -219,11 +523,11 @@ class MainWindow(QMainWindow):
         non_followers_button_layout = QVBoxLayout()
         self.find_non_followers_button = QPushButton("Find Non-Followers")
         self.find_non_followers_button.clicked.connect(
-            self.start_fetch_non_followers_thread
+            self.start_fetch_non_followers
         )
 
         self.unfollow_button = QPushButton("Unfollow Non-Followers")
-        self.unfollow_button.clicked.connect(self.start_unfollow_thread)
+        self.unfollow_button.clicked.connect(self.start_unfollow)
 
         self.clear_non_followers_button = QPushButton("Clear Non-Followers")
         self.clear_non_followers_button.clicked.connect(self.clear_non_followers_list)
@@ -237,8 +541,7 @@ class MainWindow(QMainWindow):
         ### USERS TO FOLLOW BACK SECTION ###
         # Create a vertical layout for the Users to Follow Back list and its buttons
         to_follow_layout = QVBoxLayout()
-        self.to_follow_list = QListWidget()
-        self.to_follow_list.setSelectionMode(QAbstractItemView.MultiSelection)
+        self.to_follow_list = create_list_view(self.to_follow_model)
         self.to_follow_list.setFixedHeight(
             250
         )  # Ensure all list boxes are the same height
@@ -253,12 +556,12 @@ class MainWindow(QMainWindow):
             "Find Non-Followed Followers"
         )
         self.find_non_followed_followers_button.clicked.connect(
-            self.start_non_followed_followers_thread
+            self.start_find_non_followed_followers
         )
 
         # Follow back non-followed followers and connect to thread
         self.follow_back_button = QPushButton("Follow Back Non-Followed Followers")
-        self.follow_back_button.clicked.connect(self.start_follow_back_thread)
+        self.follow_back_button.clicked.connect(self.start_follow_back)
 
         to_follow_button_layout.addWidget(self.find_non_followed_followers_button)
         to_follow_button_layout.addWidget(self.follow_back_button)
@@ -272,8 +575,7 @@ class MainWindow(QMainWindow):
         ### REPOSITORIES TO UNSTAR SECTION ###
         # Create a vertical layout for the Repositories to Unstar list and its buttons
         repos_layout = QVBoxLayout()
-        self.repo_list = QListWidget()
-        self.repo_list.setSelectionMode(QAbstractItemView.MultiSelection)
+        self.repo_list = create_list_view(self.repo_model)
         self.repo_list.setFixedHeight(250)  # Ensure all list boxes are the same height
         repos_layout.addWidget(QLabel("Repositories to Unstar:"))
         repos_layout.addWidget(self.repo_list)
@@ -282,11 +584,11 @@ class MainWindow(QMainWindow):
         repos_button_layout = QVBoxLayout()
 
         self.find_repos_button = QPushButton("Find Repositories to Unstar")
-        self.find_repos_button.clicked.connect(self.start_find_repos_to_unstar_thread)
+        self.find_repos_button.clicked.connect(self.start_find_repos_to_unstar)
 
         self.unstar_repos_button = QPushButton("Unstar Repositories")
         self.unstar_repos_button.clicked.connect(
-            self.start_unstar_selected_repos_thread
+            self.start_unstar_selected_repos
         )
 
         repos_button_layout.addWidget(self.find_repos_button)
@@ -322,6 +624,8 @@ class MainWindow(QMainWindow):
             "Search non-followers or enter comma-separated usernames..."
         )
         self.search_bar.returnPressed.connect(self.handle_search)
+        # Restart the debounce timer on every keystroke
+        self.search_bar.textChanged.connect(self.search_timer.start)
         main_layout.addWidget(self.search_bar)
 
         self.clear_all_listbox_selections_button = QPushButton(
@@ -353,10 +657,18 @@ class MainWindow(QMainWindow):
         )
 
         self.exclude_list_label = QLabel("Exceptions:")
-        self.exclude_list_box = QListWidget()
+        self.exclude_list_box = create_list_view(self.exclude_model)
         main_layout.addWidget(self.exclude_list_label)
         main_layout.addWidget(self.exclude_list_box)
 
+        # Rules typed by hand: logins, owner/name, owner/*, wildcards or re:<regex>
+        self.exception_rule_input = QLineEdit(self)
+        self.exception_rule_input.setPlaceholderText(
+            "Add exceptions: octocat, myorg/*, bot-*, re:^ci-.*"
+        )
+        self.exception_rule_input.returnPressed.connect(self.add_exception_rules)
+        main_layout.addWidget(self.exception_rule_input)
+
         self.remove_exception_button = QPushButton("Remove Selected Exception")
         self.remove_exception_button.clicked.connect(self.remove_selected_exception)
 
@@ -366,70 +678,252 @@ class MainWindow(QMainWindow):
         main_layout.addWidget(self.remove_exception_button)
         main_layout.addWidget(self.clear_exceptions_button)
 
+        # Keep the selected count current without rescanning the selections
+        for list_view in self.searchable_lists():
+            self.track_selection(list_view)
+
         # Set the layout for the main widget
         container = QWidget()
         container.setLayout(main_layout)
         self.setCentralWidget(container)
 
-    def handle_search(self):
-        # Get the search input from the search bar
-        search_term = self.search_bar.text()
-
-        # Check if the input contains commas (indicating multiple search terms)
-        if "," in search_term:
-            # Split the input by commas to get a list of search terms
-            search_terms = [term.strip() for term in search_term.split(",")]
-            # Pass the search terms list to the select_items_from_list function
-            self.select_items_from_list(search_terms)
-        else:
-            # Handle a single search term by searching across all lists
-            self.search_across_lists(search_term)
-
-        # Clear the search bar after the search is executed
-        self.search_bar.clear()
-
-    def select_items_from_list(self, search_terms):
-        # Track whether any matches are found
-        found_match = False
+    def list_models(self):
+        """Map each list saved in the session snapshot to its model."""
+        return {
+            "non_followers": self.non_follower_model,
+            "to_follow": self.to_follow_model,
+            "repos": self.repo_model,
+        }
+
+    def session_state(self):
+        state = {
+            "counts": {
+                "following": self.following_count,
+                "followers": self.followers_count,
+            },
+        }
+        # Records are saved by id; their data stays in the cache store
+        for name, model in self.list_models().items():
+            if name in self.fetched_lists:
+                state[name] = [record.id for record in model.records()]
+        return state
+
+    def save_session(self):
+        try:
+            self.github_manager.save_session(self.session_state())
+        except Exception as e:
+            print(f"Error saving session: {e}")
+
+    def restore_session(self):
+        try:
+            session = self.github_manager.load_session()
+        except Exception as e:
+            print(f"Error restoring session: {e}")
+            return
+        if not session:
+            return
+
+        # Sessions saved before exceptions had their own file still hold them
+        self.add_exceptions(session.get("exclude_list", []), "users")
+        self.add_exceptions(session.get("repo_exclude_list", []), "repos")
+
+        counts = session.get("counts", {})
+        self.set_counts(counts.get("following", 0), counts.get("followers", 0))
+        for name, model in self.list_models().items():
+            if session.get(name) is not None:
+                model.set_records(session[name])
+                self.fetched_lists.add(name)
+        self.non_follower_label.setText(
+            f"Non-followers: {self.non_follower_model.rowCount()}"
+        )
 
-        # Loop through each search term and search in all list boxes
-        for search_term in search_terms:
-            # Search across all list widgets for matching items
-            found_match = (
-                self.search_list(self.non_follower_list, search_term) or found_match
+        if self.fetched_lists:
+            self.status_label.setText("Restored last session; checking GitHub for changes...")
+            self.refreshing_lists = set(self.fetched_lists)
+            task = SessionRefreshTask(
+                self.github_manager, set(self.fetched_lists), self.exclusions.users
             )
-            found_match = self.search_list(self.repo_list, search_term) or found_match
-            found_match = (
-                self.search_list(self.to_follow_list, search_term) or found_match
+            task.finished.connect(self.on_session_refreshed)
+            self.tasks.start(task)
+
+    def set_bulk_actions_enabled(self, enabled):
+        buttons = (self.unfollow_button, self.follow_back_button, self.unstar_repos_button)
+        for button in buttons:
+            button.setEnabled(enabled)
+
+    def on_account_checked(self, reset):
+        if reset:
+            # The restored lists were another account's. The session refresh
+            # (if one is running) waited for the check, so it lists this one's
+            for model in self.list_models().values():
+                model.clear()
+            self.non_followed_followers = None
+            self.set_counts(0, 0)
+            self.non_follower_label.setText("Non-followers: 0")
+            self.status_label.setText(
+                "Signed in as another account; its lists are loading..."
+                if self.refreshing_lists
+                else "Signed in as another account; the last session was cleared."
             )
-
-        # Update the status label to indicate whether any matches were found
-        if found_match:
-            self.status_label.setText("Matching items found.")
+        self.set_bulk_actions_enabled(True)
+
+    def on_session_refreshed(self, result):
+        if not result:
+            self.status_label.setText("Showing last session; could not reach GitHub.")
+            return
+        # Lists refetched by hand in the meantime are left alone
+        refreshed = self.refreshing_lists
+        self.refreshing_lists = set()
+        if "counts" in result and "non_followers" in refreshed:
+            self.set_counts(result["counts"]["following"], result["counts"]["followers"])
+        for name, model in self.list_models().items():
+            if name in result and name in refreshed:
+                apply_records(model, result[name])
+        if "to_follow" in refreshed and "to_follow" in result:
+            self.non_followed_followers = self.to_follow_model.records()
+        self.non_follower_label.setText(
+            f"Non-followers: {self.non_follower_model.rowCount()}"
+        )
+        collections = set()
+        if refreshed & {"non_followers", "to_follow"}:
+            collections.update(("following", "followers"))
+        if "repos" in refreshed:
+            collections.add("starred")
+        if collections and self.github_manager.unchanged(collections):
+            self.status_label.setText("Up to date; nothing changed on GitHub.")
         else:
-            self.status_label.setText("No matching items found.")
-
-        # Update the count of selected items
-        self.update_selected_count()
+            self.status_label.setText("Ready")
+        self.save_session()
+
+    def set_counts(self, following, followers):
+        self.following_count = following
+        self.followers_count = followers
+        self.total_following_label.setText(f"Following: {following}")
+        self.total_followers_label.setText(f"Followers: {followers}")
+
+    def update_metrics_label(self):
+        metrics = self.github_manager.metrics
+        summary = metrics.summary()
+        # Add what the most recently finished operation cost on its own
+        operation = metrics.operations.get(self.last_operation)
+        if operation:
+            summary += (
+                f" | last {self.last_operation}: {operation['requests']:g} requests,"
+                f" {operation['pages']:g} pages, {operation['seconds']:.1f}s"
+            )
+        self.metrics_label.setText(summary)
+
+    def on_task_finished(self, name):
+        self.last_operation = name
+        self.update_metrics_label()
+        self.github_manager.export_metrics()
+
+    def closeEvent(self, event):
+        # Let bulk actions checkpoint and stop before the window goes away
+        self.tasks.cancel_all()
+        self.tasks.wait(5000)
+        self.save_session()
+        self.github_manager.export_metrics()
+        super().closeEvent(event)
+
+    def run_task(self, task, cancel_message="Cancelled."):
+        """Start ``task`` on the shared scheduler; returns False if it is already running."""
+        task.failed.connect(lambda message: self.status_label.setText(f"Error: {message}"))
+        task.cancelled.connect(lambda: self.status_label.setText(cancel_message))
+        if not self.tasks.start(task):
+            self.status_label.setText("Already running; wait for it to finish or cancel it.")
+            return False
+        return True
+
+    def resolve_pending_plan(self, task_name, journal, action):
+        """Ask whether to resume an interrupted ``journal`` job or start over.
+
+        Returns False if the user cancelled, in which case nothing is started.
+        """
+        if self.tasks.is_running(task_name):
+            # run_task reports that it is already running
+            return True
+        plan = self.github_manager.pending_plan(journal)
+        if plan is None:
+            return True
+        answer = QMessageBox.question(
+            self,
+            "Resume Interrupted Job",
+            f"An interrupted {action} still has {len(plan)} items left.\n\n"
+            "Resume it? Choose No to discard it and start over with the current lists.",
+            QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel,
+            QMessageBox.Yes,
+        )
+        if answer == QMessageBox.Cancel:
+            return False
+        if answer == QMessageBox.No:
+            self.github_manager.discard_plan(journal)
+        return True
+
+    def searchable_lists(self):
+        return [self.non_follower_list, self.repo_list, self.to_follow_list]
+
+    def start_indexing(self):
+        # A running task picks up new indexes itself; searches build what is left
+        models = [list_view.model() for list_view in self.searchable_lists()]
+        self.tasks.start(IndexTask(models))
+
+    def start_search(self):
+        text = self.search_bar.text()
+        if not text:
+            return
+        # Let a running lookup finish first; its result is dropped if stale
+        if self.tasks.is_running("search"):
+            self.search_timer.start()
+            return
+        models = [list_view.model() for list_view in self.searchable_lists()]
+        task = SearchTask(text, models)
+        task.finished.connect(self.on_search_matches)
+        self.tasks.start(task)
+
+    def on_search_matches(self, text, generations, matches):
+        # Drop results for text that has since changed
+        if text != self.search_bar.text():
+            return
+        self.search_matches = (text, generations, matches)
+
+        # Preview the matches; Enter selects them
+        total = sum(len(rows) for rows in matches)
+        for list_view, rows in zip(self.searchable_lists(), matches):
+            if rows:
+                list_view.scrollTo(list_view.model().index(rows[0]))
+        self.status_label.setText(
+            f"{total} matching items (press Enter to select)."
+            if total
+            else "No matching items found."
+        )
 
-    def search_across_lists(self, search_term):
-        search_term = search_term.lower()  # Case-insensitive search
+    def find_matches(self, text):
+        """Return the matching rows of each searchable list for ``text``."""
+        models = [list_view.model() for list_view in self.searchable_lists()]
+        generations = [model.generation for model in models]
 
-        # Track whether any matches are found
-        found_match = False
+        # Reuse the background lookup if the lists haven't changed since
+        if self.search_matches is not None:
+            cached_text, cached_generations, matches = self.search_matches
+            if cached_text == text and cached_generations == generations:
+                return matches
 
-        # Search in the non-followers list
-        found_match = (
-            self.search_list(self.non_follower_list, search_term) or found_match
-        )
+        terms = parse_search_terms(text)
+        return [model.search_index.find_many(terms) for model in models]
 
-        # Search in the repositories list
-        found_match = self.search_list(self.repo_list, search_term) or found_match
+    def handle_search(self):
+        # Get the search input from the search bar
+        search_term = self.search_bar.text()
+        self.search_timer.stop()
 
-        # Search in the users to follow list
-        found_match = self.search_list(self.to_follow_list, search_term) or found_match
+        # Comma-separated input selects every term's matches in the same pass
+        matches = self.find_matches(search_term)
+        found_match = False
+        for list_view, rows in zip(self.searchable_lists(), matches):
+            found_match = self.select_rows(list_view, rows) or found_match
 
-        # Update the status label based on whether a match was found
+        # Update the status label to indicate whether any matches were found
         if found_match:
             self.status_label.setText("Matching items found.")
         else:
@@ -438,83 +932,131 @@ class MainWindow(QMainWindow):
         # Update the count of selected items
         self.update_selected_count()
 
-    def search_list(self, list_widget, search_term):
-        """Helper function to search for a term in a given list widget."""
-        found_match = False
-        last_matched_item = None
-
-        # Iterate through all items in the list
-        for index in range(list_widget.count()):
-            item = list_widget.item(index)
-            item_text = item.text().lower()
-
-            # If the search term matches, select the item
-            if search_term.lower() in item_text:
-                item.setSelected(True)  # Select matching item
-                last_matched_item = item  # Track the last matched item for scrolling
-                found_match = True
-
-        # Scroll to the last matched item if any were found
-        if found_match and last_matched_item:
-            list_widget.scrollToItem(last_matched_item)
+        # Clear the search bar after the search is executed
+        self.search_bar.clear()
+        self.search_matches = None
+
+    def select_rows(self, list_view, rows):
+        """Add ``rows`` to a list view's selection, one range per contiguous run."""
+        if not rows:
+            return False
+        model = list_view.model()
+        selection = QItemSelection()
+        for first, last in contiguous_ranges(rows):
+            selection.select(model.index(first), model.index(last))
+        list_view.selectionModel().select(selection, QItemSelectionModel.Select)
+
+        # Scroll to the last matched row
+        list_view.scrollTo(model.index(rows[-1]))
+        return True
+
+    def track_selection(self, list_view):
+        self.selected_counts[list_view] = 0
+        selection_model = list_view.selectionModel()
+        selection_model.selectionChanged.connect(
+            lambda selected, deselected: self.on_selection_changed(
+                list_view, selected, deselected
+            )
+        )
+        # Resets and removals can drop selected rows without a selection delta
+        model = list_view.model()
+        model.modelReset.connect(lambda: self.recount_selection(list_view))
+        model.rowsRemoved.connect(lambda *_: self.recount_selection(list_view))
+
+    def on_selection_changed(self, list_view, selected, deselected):
+        self.selected_counts[list_view] += selection_size(selected) - selection_size(
+            deselected
+        )
+        self.update_selected_count()
 
-        return found_match
+    def recount_selection(self, list_view):
+        self.selected_counts[list_view] = selection_size(
+            list_view.selectionModel().selection()
+        )
+        self.update_selected_count()
 
-    def start_fetch_non_followers_thread(self):
-        # Clear the UI lists before starting the thread
+    def selected_rows(self, list_view):
+        """Return the selected row numbers of a list view, in order."""
+        rows = set()
+        for selection_range in list_view.selectionModel().selection():
+            rows.update(range(selection_range.top(), selection_range.bottom() + 1))
+        return sorted(rows)
+
+    def selected_texts(self, list_view):
+        model = list_view.model()
+        return [model.text(row) for row in self.selected_rows(list_view)]
+
+    def start_fetch_non_followers(self):
+        task = NonFollowerFetchTask(self.github_manager, self.exclusions.users)
+        task.finished.connect(self.on_non_followers_fetched)
+        task.batch.connect(self.on_non_followers_batch)
+        task.counts.connect(self.on_non_follower_counts)
+        task.progress.connect(self.on_fetch_progress)
+        # Re-enable the button however the task ends
+        task.done.connect(lambda: self.find_non_followers_button.setEnabled(True))
+        if not self.run_task(task):
+            return
+
+        # Clear the UI lists; results only arrive once this method returns
         self.clear_non_followers_list()
 
-        # Check if the cache should be cleared
-        if self.clear_cache_checkbox.isChecked():
-            self.github_manager.clear_internal_cache()
-
         # Update the status label to indicate the app is working
         self.status_label.setText("Gathering Non-Followers...")
 
         # Disable the button while fetching
         self.find_non_followers_button.setEnabled(False)
 
-        self.non_follow_fetch_worker = NonFollowerFetchThread(
-            self.github_manager, self.exclude_list
-        )
-        self.non_follow_fetch_worker.finished.connect(self.on_non_followers_fetched)
-        self.non_follow_fetch_worker.start()
+    def refresh_data(self):
+        # Invalidate the in-memory and on-disk caches
+        self.github_manager.invalidate_cache()
+        self.status_label.setText("Cache cleared. Next fetch will refresh from GitHub.")
 
-    def on_non_followers_fetched(self, non_followers, following, followers):
-        # Update the UI elements with the fetched data
-        # For example:
+    def on_fetch_progress(self, fraction):
+        self.progress_bar.setValue(int(fraction * 100))
 
-        self.non_follower_list.addItems([user.login for user in non_followers])
-        self.total_following_label.setText(f"Following: {len(following)}")
-        self.total_followers_label.setText(f"Followers: {len(followers)}")
-        self.non_follower_label.setText(f"Non-followers: {len(non_followers)}")
+    def on_non_followers_batch(self, non_followers):
+        # Show non-followers as soon as their page arrives
+        self.non_follower_model.append_records(non_followers)
+
+    def on_non_follower_counts(self, following, followers, non_followers):
+        self.set_counts(following, followers)
+        self.non_follower_label.setText(f"Non-followers: {non_followers}")
 
-        # Re-enable the button
-        self.find_non_followers_button.setEnabled(True)
+    def on_non_followers_fetched(self, non_followers, following, followers):
+        # Keep the streamed rows (and any selection), sorted by login
+        apply_records(self.non_follower_model, non_followers)
+        self.non_follower_model.sort_records(lambda user: user.login.lower())
+        self.set_counts(len(following), len(followers))
+        self.non_follower_label.setText(f"Non-followers: {len(non_followers)}")
 
-        # Update the status label
-        self.status_label.setText("Non-Followers Updated")
+        # Update the status label, saying so when nothing had to be re-listed
+        if self.github_manager.unchanged(["following", "followers"]):
+            self.status_label.setText(
+                "Non-Followers Updated (no changes on GitHub since the last sync)"
+            )
+        else:
+            self.status_label.setText("Non-Followers Updated")
+        self.fetched_lists.add("non_followers")
+        self.save_session()
+
+    def start_unfollow(self):
+        if not self.resolve_pending_plan("unfollow", "unfollow", "unfollow"):
+            return
+        task = UnfollowTask(self.github_manager, self.exclusions.users)
+        task.unfollow_complete.connect(self.on_unfollow_complete)
+        task.progress.connect(self.status_label.setText)
+        # Re-enable the button however the task ends
+        task.done.connect(lambda: self.unfollow_button.setEnabled(True))
+        if not self.run_task(task, "Cancelled; the remaining unfollows resume next time."):
+            return
 
-    def start_unfollow_thread(self):
         # Update the status label to indicate the process has started
         self.status_label.setText("Unfollowing non-followers...")
 
         # Disable the button while the process is running
         self.unfollow_button.setEnabled(False)
 
-        # Create and start the worker thread
-        self.unfollow_non_followers_worker = UnFollowthread(
-            self.github_manager, self.exclude_list
-        )
-        self.unfollow_non_followers_worker.unfollow_complete.connect(
-            self.on_unfollow_complete
-        )
-        self.unfollow_non_followers_worker.start()
-
     def on_unfollow_complete(self, unfollowed_count):
-        # Re-enable the button after unfollowing is complete
-        self.unfollow_button.setEnabled(True)
-
         # Update the status label to "Ready"
         self.status_label.setText("Ready")
 
@@ -526,48 +1068,60 @@ class MainWindow(QMainWindow):
         )
 
     def clear_non_followers_list(self):
-        self.non_follower_list.clear()
+        self.non_follower_model.clear()
+        self.fetched_lists.discard("non_followers")
+        self.refreshing_lists.discard("non_followers")
 
         self.non_follower_label.setText("Non-followers: 0")
-        self.total_following_label.setText("Following: 0")
-        self.total_followers_label.setText("Followers: 0")
+        self.set_counts(0, 0)
 
         self.status_label.setText("Ready")
 
-    def start_non_followed_followers_thread(self):
+    def start_find_non_followed_followers(self):
+        task = NonFollowedFollowersFetchTask(self.github_manager)
+        task.finished.connect(self.on_non_followed_users_fetched)
+        task.batch.connect(self.on_non_followed_users_batch)
+        task.progress.connect(self.on_fetch_progress)
+        if not self.run_task(task):
+            return
+
         self.status_label.setText("Retrieving Non-Followed Followers...")
-        self.worker_thread = NonFollowedFollowersFetchThread(self.github_manager)
-        self.worker_thread.finished.connect(self.on_non_followed_users_fetched)
-        self.worker_thread.start()
+        self.to_follow_model.clear()  # Clear the list before adding new users
+        self.fetched_lists.discard("to_follow")
+        self.refreshing_lists.discard("to_follow")
+
+    def on_non_followed_users_batch(self, users):
+        # Add the users from the latest page to the list in the UI
+        self.to_follow_model.append_records(users)
 
     def on_non_followed_users_fetched(self, users):
-        self.to_follow_list.clear()  # Clear the list before adding new users
-        for user in users:
-            self.to_follow_list.addItem(
-                user.login
-            )  # Add the user to the list in the UI
+        # Keep the users so following back needs no extra lookups
+        self.non_followed_followers = users
         self.status_label.setText("Ready")
-
-    def start_follow_back_thread(self):
+        self.fetched_lists.add("to_follow")
+        self.save_session()
+
+    def start_follow_back(self):
+        if not self.resolve_pending_plan("follow_back", "follow", "follow-back"):
+            return
+        # Reuse the "Find" results if any; otherwise the task diffs in the background
+        task = FollowBackTask(
+            self.github_manager, self.exclusions.users, self.non_followed_followers
+        )
+        task.finished.connect(self.on_follow_back_complete)
+        task.progress.connect(self.status_label.setText)
+        # Re-enable the button however the task ends
+        task.done.connect(lambda: self.follow_back_button.setEnabled(True))
+        if not self.run_task(task, "Cancelled; the remaining follows resume next time."):
+            return
 
         self.status_label.setText("Following Users You've Yet To Follow...")
         # Disable the button while following users
         self.follow_back_button.setEnabled(False)
 
-        # Get followers and following lists
-        followers = self.github_manager.get_followers()
-        following = self.github_manager.get_following()
-
-        # Create and start the worker thread
-        self.follow_back_thread = FollowBackThread(
-            self.github_manager, followers, following
-        )
-        self.follow_back_thread.finished.connect(self.on_follow_back_complete)
-        self.follow_back_thread.start()
-
     def on_follow_back_complete(self, followed_count):
-        # Re-enable the button after the operation is complete
-        self.follow_back_button.setEnabled(True)
+        # The followed users are no longer waiting to be followed back
+        self.non_followed_followers = None
 
         # Update the UI with the number of users followed
         self.status_label.setText(f"Followed back {followed_count} users.")
@@ -576,69 +1130,61 @@ class MainWindow(QMainWindow):
         # self.update_follow_back_list()
 
     def update_follow_back_list(self):
-        # Get followers and following lists again to update the "to follow" list
-        followers = self.github_manager.get_followers()
-        following = self.github_manager.get_following()
-
-        # Convert to sets of usernames for easier comparison
-        followers_set = set(user.login for user in followers)
-        following_set = set(user.login for user in following)
-
-        # Find the followers you're not following back
-        to_follow_back = followers_set - following_set
-
-        # Clear the "to follow" list box and repopulate it
-        self.to_follow_list.clear()
-        for user_login in to_follow_back:
-            self.to_follow_list.addItem(user_login)
+        # Refetch the "to follow" list in the background, never on the GUI thread
+        self.start_find_non_followed_followers()
 
-    def start_find_repos_to_unstar_thread(self):
+    def start_find_repos_to_unstar(self):
+        task = RepoFetchTask(self.github_manager)
+        task.finished.connect(self.on_repos_fetched)
+        task.batch.connect(self.on_repos_batch)
+        task.progress.connect(self.on_fetch_progress)
+        if not self.run_task(task):
+            return
 
         # Update the status label to indicate the app is working
         self.status_label.setText("Searching for Repos to Unstar...")
-        self.repo_worker_thread = RepoFetchWorkerThread(self.github_manager)
-        self.repo_worker_thread.finished.connect(self.on_repos_fetched)
-        self.repo_worker_thread.start()
+        self.repo_model.clear()
+        self.fetched_lists.discard("repos")
+        self.refreshing_lists.discard("repos")
+
+    def on_repos_batch(self, repos):
+        # Add the repos to the list as their page arrives; the model keeps the
+        # records themselves, so unstarring needs no extra lookups
+        self.repo_model.append_records(repos)
 
     def on_repos_fetched(self, repos):
-        self.repo_list.clear()
-        for repo in repos:
-            self.repo_list.addItem(
-                repo.full_name
-            )  # Add each repo's full name to the list([iterable])
         self.status_label.setText("Ready")
-
-    def start_unstar_selected_repos_thread(self):
+        self.fetched_lists.add("repos")
+        self.save_session()
+
+    def start_unstar_selected_repos(self):
+        if self.tasks.is_running("unstar"):
+            self.status_label.setText("Already running; wait for it to finish or cancel it.")
+            return
+        if not self.resolve_pending_plan("unstar", "unstar", "unstar"):
+            return
         self.status_label.setText("Unstarring Repositories...")
         # Get all repositories from the "Repos to Unstar" listbox
-        all_repos = [
-            self.repo_list.item(i).text() for i in range(self.repo_list.count())
-        ]
+        all_repos = self.repo_model.records()
 
         # Get the selected repositories to add to the exception list
-        selected_repos = [
-            repo_item.text() for repo_item in self.repo_list.selectedItems()
-        ]
+        selected_repos = self.selected_texts(self.repo_list)
 
         # Add selected repos to the exception list
-        for repo_name in selected_repos:
-            if repo_name not in self.repo_exclude_list:
-                self.repo_exclude_list.append(repo_name)
-                self.exclude_list_box.addItem(repo_name)  # Add to exceptions display
+        self.add_exceptions(selected_repos, "repos")
 
         # Start the unstar process for all repositories except the selected ones
-        self.unstar_repo_worker_thread = UnstarReposWorkerThread(
-            self.github_manager, all_repos, self.repo_exclude_list
-        )
-        self.unstar_repo_worker_thread.finished.connect(self.on_repos_unstarred)
-        self.unstar_repo_worker_thread.start()
+        task = UnstarReposTask(self.github_manager, all_repos, self.exclusions.repos)
+        task.finished.connect(self.on_repos_unstarred)
+        task.progress.connect(self.status_label.setText)
+        self.run_task(task, "Cancelled; the remaining unstars resume next time.")
 
     def on_repos_unstarred(self, unstarred_count):
         self.status_label.setText(f"Unstarred {unstarred_count} repositories.")
 
-        # Refresh the repo list after unstarring
-        self.start_find_repos_to_unstar_thread()
-        self.clear_all_exceptions()
+        # Refresh the repo list after unstarring; the exceptions are kept so
+        # the repos left starred stay protected next time
+        self.start_find_repos_to_unstar()
 
     def clear_all_listbox_selections(self):
         self.non_follower_list.clearSelection()  # Clear selection from non-followers list
@@ -647,36 +1193,42 @@ class MainWindow(QMainWindow):
 
         self.update_selected_count()  # Update count after clearing selection
 
+    def add_exceptions(self, rules, kind=None):
+        """Add the new ``rules`` to the exceptions and the exceptions box, and save.
+
+        Returns False, adding nothing, if any rule is invalid.
+        """
+        try:
+            added = self.exclusions.add(rules, kind)
+        except ExclusionError as e:
+            self.status_label.setText(str(e))
+            return False
+        if added:
+            self.exclude_model.append_records(added)  # One insert for the whole batch
+            self.save_exclusions()
+        return True
+
+    def save_exclusions(self):
+        try:
+            self.github_manager.save_exclude_list(self.exclusions)
+        except Exception as e:
+            print(f"Error saving exceptions: {e}")
+
+    def add_exception_rules(self):
+        # A rejected rule stays in the box to be corrected
+        if self.add_exceptions(parse_search_terms(self.exception_rule_input.text())):
+            self.exception_rule_input.clear()
+
     def add_selected_listbox_items_to_exceptions(self):
-        # Handle non-followers (users) selection
-        selected_users = self.non_follower_list.selectedItems()
-        for item in selected_users:
-            username = item.text()
-            if (
-                username not in self.exclude_list
-            ):  # Assuming self.exclude_list is for users
-                self.exclude_list.append(username)
-                self.exclude_list_box.addItem(username)  # Add user to exceptions list
-
-        # Handle repositories selection
-        selected_repos = self.repo_list.selectedItems()
-        for item in selected_repos:
-            repo_name = item.text()
-            if (
-                repo_name not in self.repo_exclude_list
-            ):  # Assuming self.repo_exclude_list is for repos
-                self.repo_exclude_list.append(repo_name)
-                self.exclude_list_box.addItem(repo_name)  # Add repo to exceptions list
-
-        # Handle users to follow back selection
-        selected_to_follow = self.to_follow_list.selectedItems()
-        for item in selected_to_follow:
-            username = item.text()
-            if (
-                username not in self.exclude_list
-            ):  # Assuming self.exclude_list is for users
-                self.exclude_list.append(username)
-                self.exclude_list_box.addItem(username)  # Add user to exceptions list
+        # Non-followers and users to follow back are user exceptions
+        self.add_exceptions(
+            self.selected_texts(self.non_follower_list)
+            + self.selected_texts(self.to_follow_list),
+            "users",
+        )
+
+        # Repositories are repo exceptions
+        self.add_exceptions(self.selected_texts(self.repo_list), "repos")
 
         # Update the selected count after adding
         self.update_selected_count()
@@ -684,28 +1236,23 @@ class MainWindow(QMainWindow):
         # Clear the selection from all list boxes
 
     def remove_selected_exception(self):
-        selected_items = self.exclude_list_box.selectedItems()
-        if selected_items:
-            for item in selected_items:
-                self.exclude_list.remove(item.text())  # Remove from the exclude list
-                self.exclude_list_box.takeItem(
-                    self.exclude_list_box.row(item)
-                )  # Remove from the list box
+        selected_rows = self.selected_rows(self.exclude_list_box)
+        if selected_rows:
+            removed = [self.exclude_model.text(row) for row in selected_rows]
+            # Running workers keep the matchers they started with
+            self.exclusions.remove(removed)
+            self.exclude_model.remove_rows(selected_rows)  # Remove from the list box
+            self.save_exclusions()
 
     def clear_all_exceptions(self):
-        self.exclude_list.clear()
-        self.repo_exclude_list.clear()
+        self.exclusions.clear()
         self.non_followers.clear()
-        self.exclude_list_box.clear()
+        self.exclude_model.clear()
+        self.save_exclusions()
 
     def update_selected_count(self):
-        # Count selected items from each list
-        non_follower_selected = len(self.non_follower_list.selectedItems())
-        to_follow_selected = len(self.to_follow_list.selectedItems())
-        repo_selected = len(self.repo_list.selectedItems())
-
-        # Calculate total selected items
-        total_selected = non_follower_selected + to_follow_selected + repo_selected
+        # Sum the per-list counts maintained by on_selection_changed
+        total_selected = sum(self.selected_counts.values())
 
         # Update the label with the total count
         self.selected_count_label.setText(f"Selected items: {total_selected}")